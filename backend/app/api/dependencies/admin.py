@@ -1,7 +1,8 @@
 from fastapi import Depends, HTTPException, status
 
-from app.models.user_model import User, AccessRole, CooperativeRole
-from app.api.dependencies.auth import get_current_user
+from app.models.user_model import AccessRole, CooperativeRole
+from app.api.dependencies.auth import get_current_principal
+from app.services.principal_cache import Principal
 from typing import Set
 
 
@@ -10,8 +11,8 @@ def require_roles(*allowed_roles: AccessRole):
     allowed_roles_set: Set[str] = {role.value for role in allowed_roles}
 
     async def role_checker(
-        current_user: User = Depends(get_current_user),
-    ) -> User:
+        current_user: Principal = Depends(get_current_principal),
+    ) -> Principal:
         if not set(current_user.access_roles).intersection(allowed_roles_set):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -23,8 +24,8 @@ def require_roles(*allowed_roles: AccessRole):
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     """Ensure the current user is an admin."""
     if AccessRole.ADMIN.value not in current_user.access_roles:
         raise HTTPException(
@@ -36,15 +37,17 @@ async def get_current_admin(
 
 # Ensure the current user is at least moderator or admin.
 async def get_current_moderator_or_admin(
-    current_user: User = Depends(require_roles(AccessRole.MODERATOR, AccessRole.ADMIN)),
-) -> User:
+    current_user: Principal = Depends(
+        require_roles(AccessRole.MODERATOR, AccessRole.ADMIN)
+    ),
+) -> Principal:
     """Ensure the current user is at least moderator or admin."""
     return current_user
 
 
 async def get_current_policy_manager(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     """Ensure the current user can manage policies.
 
     Allowed if the user is a Treasurer (cooperative role) OR has
@@ -1,41 +1,43 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 from uuid import UUID
 import jwt
 
-from app.core.db import get_session
+from app.core.db import get_async_session
 from app.core.config import settings
+from app.core.security import verify_and_decode
 from app.models.user_model import User
+from app.services.principal_cache import Principal, principal_cache
 
 # tokenUrl should match the actual login endpoint
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="/api/v1/auth/login"
 )  # or "api/v1/login/token" depending on your setup
+# Same scheme for endpoints where signing in is optional
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="/api/v1/auth/login", auto_error=False
+)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
-) -> User:
-    """Decode the JWT token and retrieve the current user."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> UUID:
+    """Decode the JWT token and return the user id it was issued for."""
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            options={"verify_exp": True},
-        )
+        payload = verify_and_decode(token)
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-        token_data = UUID(user_id)
+            raise _credentials_exception()
+        return UUID(user_id)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -43,17 +45,51 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     except jwt.InvalidTokenError:
-        raise credentials_exception
+        raise _credentials_exception()
     except jwt.PyJWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    except ValueError:
+        raise _credentials_exception()
+
 
-    statement = select(User).where(User.id == token_data)
-    user = session.exec(statement).first()
+async def _load_user(session: AsyncSession, user_id: UUID) -> User:
+    statement = select(User).where(User.id == user_id)
+    user = (await session.exec(statement)).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        await principal_cache.set(Principal.from_user(user))
     return user
 
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> User:
+    """
+    Decode the JWT token and load the current user's row. Only for routes
+    that change or return the user itself; everything else should depend
+    on get_current_principal.
+    """
+    return await _load_user(session, _user_id_from_token(token))
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> Principal:
+    """
+    Decode the JWT token and resolve the caller from the principal cache,
+    reading the user table only on a miss.
+    """
+    user_id = _user_id_from_token(token)
+    if settings.PRINCIPAL_CACHE_ENABLED:
+        principal = await principal_cache.get(user_id)
+        if principal is not None:
+            return principal
+    return Principal.from_user(await _load_user(session, user_id))
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -65,3 +101,28 @@ async def get_current_active_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return current_user
+
+
+async def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """Ensure the current principal is active."""
+    if principal.disabled:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is disabled",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+async def get_optional_active_principal(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> Optional[Principal]:
+    """The active principal when a token is sent, otherwise None."""
+    if token is None:
+        return None
+    return await get_current_active_principal(
+        await get_current_principal(token, session)
+    )
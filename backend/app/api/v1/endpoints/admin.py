@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 from uuid import UUID
 
-from app.core.db import get_session
-from app.models.user_model import User
+from app.core.db import get_async_session
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import Principal, principal_cache
+from app.services.refresh_tokens import refresh_tokens
 from app.schemas.user_schema import (
     UserResponse,
     AdminAssignUserRoles,
@@ -22,8 +24,8 @@ user_service = UserService()
 async def list_users(
     skip: int = 0,
     limit: int = Query(10, le=100),
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: Principal = Depends(get_current_admin),
 ):
     """
     List users with pagination. Admin access required.
@@ -33,8 +35,8 @@ async def list_users(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Admin access required",
         )
-    users = user_service.get_all_users(session=session, skip=skip, limit=limit)
-    total = user_service.get_total_user_count(session=session)
+    users = await user_service.get_all_users(session=session, skip=skip, limit=limit)
+    total = await user_service.get_total_user_count(session=session)
     if not users:
         return []
     return PaginatedUserListResponse(
@@ -48,8 +50,8 @@ async def list_users(
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user_as_admin(
     user_id: UUID,
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: Principal = Depends(get_current_admin),
 ):
     """
     Get user details by ID. Admin access required.
@@ -59,7 +61,7 @@ async def get_user_as_admin(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Admin access required",
         )
-    user = user_service.get_user_by_id(session=session, user_id=user_id)
+    user = await user_service.get_user_by_id(session=session, user_id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -72,8 +74,8 @@ async def get_user_as_admin(
 async def assign_user_roles_as_admin(
     user_id: UUID,
     user_update: AdminAssignUserRoles,
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: Principal = Depends(get_current_admin),
 ):
     """
     Update user roles and status. Admin access required.
@@ -84,7 +86,7 @@ async def assign_user_roles_as_admin(
             detail="Admin users cannot modify their own roles or status",
         )
     try:
-        user = user_service.admin_assign_user_roles(
+        user = await user_service.admin_assign_user_roles(
             session=session, user_id=user_id, user_in=user_update
         )
         return user
@@ -98,8 +100,8 @@ async def assign_user_roles_as_admin(
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user_as_admin(
     user_id: UUID,
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: Principal = Depends(get_current_admin),
 ):
     """
     Delete a user by ID. Admin access required.
@@ -109,7 +111,7 @@ async def delete_user_as_admin(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Admin users cannot delete themselves",
         )
-    success = user_service.admin_delete_user(session=session, user_id=user_id)
+    success = await user_service.admin_delete_user(session=session, user_id=user_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -121,13 +123,13 @@ async def delete_user_as_admin(
 @router.post("/users/{user_id}/toggle-disabled", response_model=UserResponse)
 async def toggle_user_disabled_status(
     user_id: UUID,
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: Principal = Depends(get_current_admin),
 ):
     """
     Toggle the disabled status of a user. Admin access required.
     """
-    user = user_service.get_user_by_id(session=session, user_id=user_id)
+    user = await user_service.get_user_by_id(session=session, user_id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -144,6 +146,19 @@ async def toggle_user_disabled_status(
 
     user.updated_at = datetime.now(timezone.utc)
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await principal_cache.invalidate(user.id)
+    await session.commit()
+    await session.refresh(user)
+    if user.disabled:
+        await refresh_tokens.revoke_all(user.id)
     return user
+
+
+@router.get("/password-hashing")
+async def password_hashing_stats(
+    current_admin: Principal = Depends(get_current_admin),
+):
+    """
+    Password hashing pool size, load and queue wait times. Admin access required.
+    """
+    return password_hasher.stats()
@@ -1,17 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import timedelta
-from uuid import uuid4
 
 from app.models.user_model import User
+from app.services.principal_cache import principal_cache
+from app.services.refresh_tokens import refresh_tokens
 from app.services.user_service import UserService
 from app.core.security import create_access_token, decode_url_safe_token
 from app.schemas.user_schema import TokenResponse
 from app.core.config import settings
-from app.core.db import get_session
-from app.core.redis_client import redis_client
+from app.core.db import get_async_session
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 user_service = UserService()
@@ -21,14 +21,14 @@ user_service = UserService()
 async def login_for_access_token(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Authenticate user and return access token.
 
     **Note:** Enter your EMAIL address in the 'username' field below.
     """
-    user = user_service.authenticate_user(
+    user = await user_service.authenticate_user(
         session=session, email=form_data.username, password=form_data.password
     )
 
@@ -47,14 +47,8 @@ async def login_for_access_token(
         expires_delta=access_token_expiry,
     )
 
-    # generate refresh token
-    refresh_token = str(uuid4())
-    # store refresh token in Redis with expiration
-    redis_client.setex(
-        f"refresh_token:{refresh_token}",  # Redis key
-        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-        str(user.id),
-    )
+    # generate refresh token and store it in Redis with expiration
+    refresh_token = await refresh_tokens.issue(user.id)
     # send refresh token as httpOnly cookie (not in response body)
     is_production = settings.ENVIRONMENT == "production"
     response.set_cookie(
@@ -77,7 +71,7 @@ async def login_for_access_token(
 async def refresh_access_token(
     request: Request,
     response: Response,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Refresh access token using refresh token.
@@ -92,10 +86,10 @@ async def refresh_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Validate refresh token from Redis
-    old_key = f"refresh_token:{refresh_token}"
-    user_id = redis_client.get(old_key)
-    if not user_id:
+    # Check the token's owner before rotating, so a deleted or disabled
+    # user's token is revoked instead of exchanged
+    user_id = await refresh_tokens.lookup(refresh_token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
@@ -103,29 +97,35 @@ async def refresh_access_token(
         )
 
     # Get user from database
-    from uuid import UUID
     from sqlmodel import select
 
-    statement = select(User).where(User.id == UUID(str(user_id)))
-    user = session.exec(statement).first()
+    statement = select(User).where(User.id == user_id)
+    user = (await session.exec(statement)).first()
 
     if not user:
+        await refresh_tokens.revoke(refresh_token)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
+    if user.disabled:
+        await refresh_tokens.revoke(refresh_token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is disabled",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    # Refresh token rotation 
-    # Invalidate the old refresh token
-    redis_client.delete(old_key)
-
-    # Issue a new refresh token
-    new_refresh_token = str(uuid4())
-    redis_client.setex(
-        f"refresh_token:{new_refresh_token}",
-        timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
-        str(user.id),
-    )
+    # Refresh token rotation: the old token is consumed and its replacement
+    # stored in one atomic step, so a replayed token fails
+    rotated = await refresh_tokens.rotate(refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    _, new_refresh_token = rotated
 
     # Set new refresh token cookie
     is_production = settings.ENVIRONMENT == "production"
@@ -164,7 +164,9 @@ async def verify_email_redirect(token: str):
 
 # actual verification logic called by the frontend
 @router.post("/verify-email", status_code=status.HTTP_200_OK)
-async def verify_email_token(token: str, session: Session = Depends(get_session)):
+async def verify_email_token(
+    token: str, session: AsyncSession = Depends(get_async_session)
+):
     """
     Verify email using the provided token. Called by the frontend page.
     """
@@ -182,7 +184,7 @@ async def verify_email_token(token: str, session: Session = Depends(get_session)
             detail=f"Email verification failed: {str(e)}",
         )
 
-    user = user_service.get_user_by_email(session=session, email=user_email)
+    user = await user_service.get_user_by_email(session=session, email=user_email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -198,7 +200,8 @@ async def verify_email_token(token: str, session: Session = Depends(get_session)
     user.updated_at = datetime.now(timezone.utc)
 
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await principal_cache.invalidate(user.id)
+    await session.commit()
+    await session.refresh(user)
 
     return {"msg": "Email verified successfully."}
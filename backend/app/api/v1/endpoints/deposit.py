@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 
-from app.core.db import get_session
+from app.core.db import get_async_session
 from app.schemas.deposit_schema import (
     DepositCreate,
     DepositUserUpdate,
@@ -18,8 +18,8 @@ from app.schemas.smart_deposit_schema import (
     SmartDepositCreate,
     SmartDepositResponse,
 )
-from app.api.dependencies.auth import get_current_active_user
-from app.models.user_model import User
+from app.api.dependencies.auth import get_current_active_principal
+from app.services.principal_cache import Principal
 
 
 router = APIRouter(prefix="/deposits", tags=["deposits"])
@@ -32,16 +32,16 @@ smart_deposit_service = SmartDepositService()
     response_model=DepositResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_deposit(
+async def create_deposit(
     deposit_in: DepositCreate,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a new deposit.
     """
-    new_deposit = deposit_service.create_deposit(
+    new_deposit = await deposit_service.create_deposit(
         session=session,
         deposit_in=deposit_in,
         user_id=current_user.id,
@@ -53,17 +53,17 @@ def create_deposit(
     "/deposit/{deposit_id}/me",
     response_model=DepositResponse,
 )
-def update_deposit(
+async def update_deposit(
     deposit_id: UUID,
     deposit_in: DepositUserUpdate,
     request: Request,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Update an existing deposit.
     """
-    updated_deposit = deposit_service.user_update_deposit(
+    updated_deposit = await deposit_service.user_update_deposit(
         session=session,
         deposit_id=deposit_id,
         deposit_in=deposit_in,
@@ -76,16 +76,16 @@ def update_deposit(
     "/deposit/{deposit_id}/moderator",
     response_model=DepositResponse,
 )
-def moderator_update_deposit(
+async def moderator_update_deposit(
     deposit_id: UUID,
     deposit_in: DepositModeratorUpdate,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Moderator update for an existing deposit.
     """
-    updated_deposit = deposit_service.verify_deposit(
+    updated_deposit = await deposit_service.verify_deposit(
         session=session,
         deposit_id=deposit_id,
         deposit_in=deposit_in,
@@ -98,15 +98,15 @@ def moderator_update_deposit(
     "/deposit/{deposit_id}",
     response_model=DepositResponse,
 )
-def get_deposit(
+async def get_deposit(
     deposit_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Retrieve a deposit by its ID.
     """
-    deposit = deposit_service.get_deposit(
+    deposit = await deposit_service.get_deposit(
         session=session,
         deposit_id=deposit_id,
     )
@@ -117,12 +117,12 @@ def get_deposit(
     "/deposit/{deposit_id}/me",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_my_deposit(
+async def delete_my_deposit(
     deposit_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    deposit_service.user_delete_deposit(
+    await deposit_service.user_delete_deposit(
         session=session,
         deposit_id=deposit_id,
         user_id=current_user.id,
@@ -134,12 +134,12 @@ def delete_my_deposit(
     "/deposit/{deposit_id}/moderator",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_deposit_by_moderator(
+async def delete_deposit_by_moderator(
     deposit_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    deposit_service.moderator_delete_deposit(
+    await deposit_service.moderator_delete_deposit(
         session=session,
         deposit_id=deposit_id,
         current_user=current_user,
@@ -156,17 +156,17 @@ def delete_deposit_by_moderator(
     "/preview",
     response_model=DepositPreviewResponse,
 )
-def preview_deposit(
+async def preview_deposit(
     req: DepositPreviewRequest,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Compute the deposit breakdown: charge deduction, late fine,
     excess amount, and suggested split allocations.
     No database writes — purely a preview.
     """
-    return smart_deposit_service.preview(
+    return await smart_deposit_service.preview(
         session=session,
         req=req,
         user_id=current_user.id,
@@ -178,17 +178,17 @@ def preview_deposit(
     response_model=SmartDepositResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_smart_deposit(
+async def create_smart_deposit(
     req: SmartDepositCreate,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    current_user: Principal = Depends(get_current_active_principal),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a deposit with smart-split allocations.
     Creates the deposit, fine (if late), and loan payments (if allocated)
     in a single transaction.
     """
-    return smart_deposit_service.execute(
+    return await smart_deposit_service.execute(
         session=session,
         req=req,
         user_id=current_user.id,
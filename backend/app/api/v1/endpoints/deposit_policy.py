@@ -14,8 +14,9 @@ from app.schemas.policy.deposit_policy_schema import (
 )
 from app.services.deposit_policy_service import DepositPolicyService
 from app.api.dependencies.admin import get_current_policy_manager
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_principal
 from app.models.user_model import User, CooperativeRole
+from app.services.principal_cache import Principal
 from app.models.notification_model import Notification, NotificationType
 from app.services.email_notify import send_generic_email
 from fastapi_mail import NameEmail
@@ -125,7 +126,7 @@ def _notify_creator(
     status_code=status.HTTP_200_OK,
 )
 def list_deposit_policies(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -145,7 +146,7 @@ def list_deposit_policies(
 def create_deposit_policy(
     policy_in: DepositPolicyCreate,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -178,7 +179,7 @@ def create_deposit_policy(
 def submit_deposit_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -222,7 +223,7 @@ def submit_deposit_policy(
 def approve_deposit_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -272,7 +273,7 @@ def approve_deposit_policy(
 def reject_deposit_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -321,7 +322,7 @@ def reject_deposit_policy(
 def delete_deposit_policy(
     policy_id: UUID,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -346,7 +347,7 @@ def update_deposit_policy(
     policy_id: UUID,
     policy_in: DepositPolicyUpdate,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -14,9 +14,10 @@ from app.schemas.policy.loan_policy_schema import (
 )
 from app.services.loan_policy_service import LoanPolicyService
 from app.api.dependencies.admin import get_current_policy_manager
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_principal
 from app.core.config import settings
 from app.models.user_model import User, CooperativeRole
+from app.services.principal_cache import Principal
 from app.models.notification_model import Notification, NotificationType
 from app.services.email_notify import send_generic_email
 from fastapi_mail import NameEmail
@@ -125,7 +126,7 @@ def _notify_creator_loan(
     status_code=status.HTTP_200_OK,
 )
 def list_loan_policies(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -145,7 +146,7 @@ def list_loan_policies(
 def create_loan_policy(
     policy_in: LoanPolicyCreate,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -178,7 +179,7 @@ def create_loan_policy(
 def submit_loan_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -222,7 +223,7 @@ def submit_loan_policy(
 def approve_loan_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -272,7 +273,7 @@ def approve_loan_policy(
 def reject_loan_policy(
     policy_id: UUID,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -321,7 +322,7 @@ def reject_loan_policy(
 def delete_loan_policy(
     policy_id: UUID,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -346,7 +347,7 @@ def update_loan_policy(
     policy_id: UUID,
     policy_in: LoanPolicyUpdate,
     request: Request,
-    current_user: User = Depends(get_current_policy_manager),
+    current_user: Principal = Depends(get_current_policy_manager),
     session: Session = Depends(get_session),
 ):
     """
@@ -6,8 +6,8 @@ from uuid import UUID
 from app.core.db import get_session
 from app.models.notification_model import Notification
 from app.schemas.notification_schema import NotificationResponse
-from app.api.dependencies.auth import get_current_user
-from app.models.user_model import User
+from app.api.dependencies.auth import get_current_principal
+from app.services.principal_cache import Principal
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/notifications", tags=["notifications"])
     status_code=status.HTTP_200_OK,
 )
 def list_notifications(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -38,7 +38,7 @@ def list_notifications(
     status_code=status.HTTP_200_OK,
 )
 def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -63,7 +63,7 @@ def mark_all_notifications_read(
 )
 def mark_notification_read(
     notification_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     session: Session = Depends(get_session),
 ):
     """
@@ -1,44 +1,346 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    Depends,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from celery import group
 from celery.result import AsyncResult
-from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+import hashlib
+import json
+import mmap
+import os
 import uuid
-import shutil
 
-from app.tasks.ocr_task import process_ocr_task, celery_app
+from app.api.dependencies.admin import get_current_admin
+from app.api.dependencies.auth import get_optional_active_principal
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+from app.services.image_quality import ImageQualityError, check_image_quality
+from app.services.image_transport import (
+    ImageUpload,
+    discard_image,
+    get_image_transport,
+)
+from app.services.ocr_admission import AdmissionDenied, ocr_admission
+from app.services.ocr_cache import ocr_result_cache
+from app.services.ocr_events import stream_task_events
+from app.services.ocr_metrics import ocr_metrics
+from app.services.ocr_status import fetch_task_status, fetch_task_statuses
+from app.services.principal_cache import Principal
+from app.services.receipt_hash_index import flag_duplicate
+from app.schemas.ocr_schema import TaskStatusBulkRequest
+from app.models.user_model import AccessRole, CooperativeRole
+from app.services.smart_deposit_service import preview_for_ocr_result
+from app.services.receipt_templates import template_registry
+from app.services.statement_service import StatementService
+from app.tasks.ocr_task import (
+    process_ocr_task,
+    process_statement_page_task,
+    celery_app,
+)
 
-router = APIRouter(prefix="/v1/ocr", tags=["OCR"])
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Multipart framing and form fields allowed per file on top of its bytes
+MULTIPART_OVERHEAD = 64 * 1024
+BATCH_KEY_PREFIX = "ocr_batch"
 
-# temporary directory to store uploaded images
-UPLOAD_DIR = Path("/tmp/ocr_uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Files each upload endpoint accepts; its request body is capped accordingly
+UPLOAD_FILE_COUNTS = {
+    "process_image": 1,
+    "process_batch": settings.OCR_BATCH_MAX_FILES,
+    "process_statement": 1,
+}
 
 
-@router.post("/process-image")
-async def process_image(file: UploadFile = File(...)):
+def _upload_too_large() -> HTTPException:
+    return HTTPException(status_code=400, detail="File size exceeds 10MB limit.")
+
+
+class UploadLimitRoute(APIRoute):
     """
-    Endpoint to upload an image file and initiate OCR processing.
-    Returns a task ID to check the status later.
+    Caps the request body of the upload endpoints before FastAPI parses and
+    spools the multipart form: a declared Content-Length over the limit is
+    refused outright, and a body without one is cut off once it passes it.
     """
 
-    # validate file type
-    if not file.content_type.startswith("image/"):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        files = UPLOAD_FILE_COUNTS.get(self.name)
+        if files is None:
+            return handler
+        limit = files * (MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD)
+
+        async def limited_handler(request: Request):
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                raise _upload_too_large()
+
+            received = 0
+
+            async def receive():
+                nonlocal received
+                message = await request.receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise _upload_too_large()
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/v1/ocr", tags=["OCR"], route_class=UploadLimitRoute)
+
+
+def _write_chunk(upload: ImageUpload, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    upload.write(chunk)
+
+
+async def _save_upload(file: UploadFile, upload: ImageUpload) -> str:
+    """
+    Copy an upload into the image transport in fixed-size chunks and return
+    its SHA-256. Transport writes and hashing run in the threadpool so a
+    large upload never blocks the event loop. UploadLimitRoute has already
+    bounded the request body; this aborts the partial upload if the file
+    itself exceeds MAX_UPLOAD_SIZE.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_SIZE:
+                raise _upload_too_large()
+            await run_in_threadpool(_write_chunk, upload, hasher, chunk)
+    except BaseException:
+        await run_in_threadpool(upload.abort)
+        raise
+    return hasher.hexdigest()
+
+
+def _validate_image(file: UploadFile) -> None:
+    if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(
             status_code=400, detail="Invalid file type. Please upload an image."
         )
 
-    # validate file size (max 10MB)
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit.")
 
-    # generate a unique filename
-    file_path = UPLOAD_DIR / f"{uuid.uuid4()}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(contents)
+@contextmanager
+def _mapped_upload(file: UploadFile) -> Iterator[bytes | mmap.mmap]:
+    """
+    Map an upload's spooled temp file read-only, so checks that need the
+    whole body read it from the spool instead of copying it into memory.
+    Run from the threadpool.
+    """
+    # fileno() rolls an upload still held in memory over to its temp file
+    fd = file.file.fileno()
+    if os.fstat(fd).st_size == 0:
+        yield b""  # mmap cannot map an empty file
+        return
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def _check_spooled_quality(file: UploadFile) -> None:
+    with _mapped_upload(file) as data:
+        check_image_quality(data)
+
+
+def _count_spooled_pages(file: UploadFile) -> int:
+    with _mapped_upload(file) as data:
+        return StatementService.page_count(data)
+
+
+async def _check_quality(file: UploadFile) -> None:
+    """Raise ImageQualityError for uploads too small, blurry or blank to OCR."""
+    await run_in_threadpool(_check_spooled_quality, file)
+
+
+def _admission_owner(request: Request, user: Optional[Principal]) -> str:
+    if user is not None:
+        return f"user:{user.id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _uses_priority_queue(user: Optional[Principal]) -> bool:
+    """Treasurers, moderators and admins run batches on the priority queue."""
+    if user is None:
+        return False
+    return CooperativeRole.TREASURER.value in (user.cooperative_roles or []) or bool(
+        set(user.access_roles or [])
+        & {AccessRole.MODERATOR.value, AccessRole.ADMIN.value}
+    )
+
+
+async def _reserve(owner: str, task_ids: list[str]) -> None:
+    """
+    Count ``task_ids`` in flight for ``owner``, or refuse the request with
+    429 and a Retry-After header if they would overload the queue. Every
+    reserved id that does not get queued must be passed to ``_release``.
+    """
+    if not settings.OCR_ADMISSION_ENABLED:
+        return
+    try:
+        await run_in_threadpool(ocr_admission.reserve, owner, task_ids)
+    except AdmissionDenied as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _release(task_ids: list[str]) -> None:
+    if settings.OCR_ADMISSION_ENABLED and task_ids:
+        await run_in_threadpool(ocr_admission.release, *task_ids)
+
+
+async def _stage_upload(
+    file: UploadFile,
+) -> tuple[ImageUpload | None, str, dict | None]:
+    """
+    Stream an upload into the image transport without committing it.
+    Returns ``(upload, image_hash, cached)``: on a cache hit the upload is
+    dropped and ``cached`` holds the earlier OCR data, flagged as a duplicate
+    of the same image when duplicate detection is on; otherwise ``upload``
+    is pending, to be committed once its task is admitted or aborted.
+    Raises ImageQualityError, after dropping the upload, if the image fails
+    the quality gate.
+    """
+    upload = await run_in_threadpool(get_image_transport().open_upload)
+    image_hash = await _save_upload(file, upload)
+
+    if settings.OCR_CACHE_ENABLED:
+        cached = await run_in_threadpool(ocr_result_cache.get, image_hash)
+        if cached is not None:
+            await run_in_threadpool(upload.abort)
+            if settings.OCR_DUPLICATE_DETECTION_ENABLED:
+                # The same bytes were uploaded before: the most certain duplicate
+                cached = flag_duplicate(cached, image_hash)
+            return None, image_hash, cached
+
+    if settings.OCR_QUALITY_GATE_ENABLED:
+        try:
+            await _check_quality(file)
+        except ImageQualityError:
+            await run_in_threadpool(upload.abort)
+            raise
+
+    return upload, image_hash, None
 
-    # Queue the OCR processing task
-    task = process_ocr_task.apply_async(args=[str(file_path)])
+
+async def _abort_uploads(uploads: list[ImageUpload]) -> None:
+    for upload in uploads:
+        await run_in_threadpool(upload.abort)
+
+
+async def _discard_images(image_refs: list[str]) -> None:
+    for image_ref in image_refs:
+        await run_in_threadpool(discard_image, image_ref)
+
+
+@router.post("/process-image")
+async def process_image(
+    request: Request,
+    file: UploadFile = File(...),
+    policy_id: Optional[uuid.UUID] = Form(None),
+    current_user: Optional[Principal] = Depends(get_optional_active_principal),
+):
+    """
+    Endpoint to upload an image file and initiate OCR processing.
+    Returns a task ID to check the status later, or the completed result
+    straight away if the same image has already been processed.
+    With ``policy_id`` (signed in only) the result also carries the
+    deposit preview for that policy, so no separate /deposits/preview call
+    is needed.
+    Responds 429 with Retry-After while the OCR queue or the caller's own
+    in-flight uploads are at their limit.
+    """
+
+    # validate file type
+    _validate_image(file)
+
+    deposit_preview = None
+    if policy_id is not None:
+        if current_user is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Sign in to preview a deposit.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        deposit_preview = {
+            "policy_id": str(policy_id),
+            "user_id": str(current_user.id),
+        }
+
+    # copy the upload to the worker transport, enforcing the per-file size
+    # limit, and reject images that cannot be OCR'd
+    try:
+        upload, image_hash, cached = await _stage_upload(file)
+    except ImageQualityError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # return the cached result if this exact image was processed before;
+    # it costs no OCR, so it never waits on admission
+    if cached is not None:
+        result = {"status": "success", "data": cached}
+        if deposit_preview is not None:
+            result.update(
+                await run_in_threadpool(
+                    preview_for_ocr_result, cached, policy_id, current_user.id
+                )
+            )
+        return JSONResponse(
+            {
+                "task_id": None,
+                "status": "completed",
+                "cached": True,
+                "result": result,
+            }
+        )
+
+    # Admit the task before committing its image; the slot is released
+    # and the image dropped again unless the task gets queued
+    task_id = str(uuid.uuid4())
+    try:
+        await _reserve(_admission_owner(request, current_user), [task_id])
+    except BaseException:
+        await _abort_uploads([upload])
+        raise
+    image_ref = None
+    queued = False
+    try:
+        image_ref = await run_in_threadpool(upload.commit, image_hash)
+
+        # Queue the OCR processing task
+        task = process_ocr_task.apply_async(
+            args=[image_ref],
+            kwargs={"image_hash": image_hash, "deposit_preview": deposit_preview},
+            task_id=task_id,
+        )
+        queued = True
+    finally:
+        if not queued:
+            if image_ref is None:
+                await _abort_uploads([upload])
+            else:
+                await _discard_images([image_ref])
+            await _release([task_id])
 
     return JSONResponse(
         {
@@ -49,54 +351,378 @@ async def process_image(file: UploadFile = File(...)):
     )
 
 
-@router.get("/task-status/{task_id}")
-async def get_task_status(task_id: str):
+@router.post("/process-batch")
+async def process_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    current_user: Optional[Principal] = Depends(get_optional_active_principal),
+):
     """
-    Endpoint to check the status of an OCR processing task.
-    Returns the status and result if completed.
+    Endpoint to upload many images in one request and OCR them as a
+    Celery group. Returns a batch ID whose status reports per-item
+    progress and the combined result once every item has finished.
+    Batches from treasurers, moderators and admins skip admission control
+    and run on the priority queue; others are admitted like single uploads.
     """
-    task_result = AsyncResult(task_id, app=celery_app)
-
-    if task_result.state == "PENDING":
-        return JSONResponse(
-            {
-                "task_id": task_id,
-                "status": "pending",
-                "message": "Task is pending execution.",
-            }
+    if len(files) > settings.OCR_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {settings.OCR_BATCH_MAX_FILES} files.",
         )
-    elif task_result.state == "STARTED":
-        return JSONResponse(
-            {
-                "task_id": task_id,
-                "status": "in_progress",
-                "message": "Task is currently being processed.",
-            }
+    for file in files:
+        _validate_image(file)
+
+    # Stage every file first: rejected and cached ones never count against
+    # admission
+    items: list[dict] = []
+    pending: list[tuple[dict, ImageUpload, str]] = []
+    try:
+        for index, file in enumerate(files):
+            item = {"index": index, "filename": file.filename, "task_id": None}
+            items.append(item)
+            try:
+                upload, image_hash, cached = await _stage_upload(file)
+            except ImageQualityError as e:
+                # Rejected images fail on their own without holding up the batch
+                item["error"] = str(e)
+                continue
+            if cached is not None:
+                item["result"] = {"status": "success", "data": cached}
+            else:
+                pending.append((item, upload, image_hash))
+    except BaseException:
+        # A later file failed the whole request
+        await _abort_uploads([upload for _, upload, _ in pending])
+        raise
+
+    priority = _uses_priority_queue(current_user)
+    task_ids = [str(uuid.uuid4()) for _ in pending]
+    if not priority:
+        try:
+            await _reserve(_admission_owner(request, current_user), task_ids)
+        except BaseException:
+            await _abort_uploads([upload for _, upload, _ in pending])
+            raise
+
+    signatures = []
+    image_refs: list[str] = []
+    queued = False
+    try:
+        for (item, upload, image_hash), task_id in zip(pending, task_ids):
+            image_ref = await run_in_threadpool(upload.commit, image_hash)
+            image_refs.append(image_ref)
+            item["task_id"] = task_id
+            signature = process_ocr_task.s(image_ref, image_hash=image_hash).set(
+                task_id=task_id
+            )
+            if priority:
+                signature = signature.set(queue=settings.OCR_PRIORITY_QUEUE)
+            signatures.append(signature)
+
+        if signatures:
+            group(signatures).apply_async()
+        queued = True
+    finally:
+        if not queued:
+            # Nothing will OCR these; drop them and free their slots
+            await _abort_uploads([u for _, u, _ in pending[len(image_refs) :]])
+            await _discard_images(image_refs)
+            if not priority:
+                await _release(task_ids)
+
+    batch_id = str(uuid.uuid4())
+    await async_redis_client.setex(
+        f"{BATCH_KEY_PREFIX}:{batch_id}",
+        celery_app.conf.result_expires,
+        json.dumps(items),
+    )
+
+    return JSONResponse(
+        {
+            "batch_id": batch_id,
+            "status": "processing" if signatures else "completed",
+            "total": len(items),
+            "message": "Batch OCR processing has been initiated.",
+        }
+    )
+
+
+@router.get("/batch-status/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """
+    Endpoint to check the progress of a batch OCR request.
+    Includes the combined results once every item has finished.
+    """
+    raw = await async_redis_client.get(f"{BATCH_KEY_PREFIX}:{batch_id}")
+    if raw is None:
+        raise HTTPException(status_code=404, detail="Batch not found or expired.")
+
+    items = json.loads(raw)
+    task_statuses = await fetch_task_statuses(
+        [item["task_id"] for item in items if item["task_id"] is not None]
+    )
+
+    statuses = []
+    for item in items:
+        if "error" in item:
+            status = {"status": "failed", "message": item["error"]}
+        elif item["task_id"] is None:
+            status = {"status": "completed", "cached": True, "result": item["result"]}
+        else:
+            status = task_statuses[item["task_id"]]
+        statuses.append(
+            {"index": item["index"], "filename": item["filename"], **status}
         )
-    elif task_result.state == "SUCCESS":
-        return JSONResponse(
-            {
-                "task_id": task_id,
-                "status": "completed",
-                "result": task_result.result,
-            }
+
+    counts = {
+        state: sum(1 for s in statuses if s["status"] == state)
+        for state in ("completed", "failed")
+    }
+    finished = counts["completed"] + counts["failed"] == len(statuses)
+    response = {
+        "batch_id": batch_id,
+        "status": "completed" if finished else "processing",
+        "total": len(statuses),
+        **counts,
+        "items": statuses,
+    }
+    if finished:
+        response["results"] = [
+            s["result"]["data"] if s["status"] == "completed" else None
+            for s in statuses
+        ]
+    return JSONResponse(response)
+
+
+@router.post("/process-statement")
+async def process_statement(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: Optional[Principal] = Depends(get_optional_active_principal),
+):
+    """
+    Endpoint to upload a PDF bank statement and OCR its pages in parallel.
+    Returns a statement ID; transactions stream back page by page from
+    /statement-events/{statement_id}.
+    Every page counts as one OCR task for admission control, so a statement
+    gets 429 with Retry-After while the queue or the caller is at its limit.
+    """
+    if file.content_type != "application/pdf":
+        raise HTTPException(
+            status_code=400, detail="Invalid file type. Please upload a PDF."
         )
-    elif task_result.state == "FAILURE":
-        return JSONResponse(
-            {
-                "task_id": task_id,
-                "status": "failed",
-                "message": str(task_result.result),
-            }
+
+    upload = await run_in_threadpool(get_image_transport().open_upload)
+    image_hash = await _save_upload(file, upload)
+
+    try:
+        pages = await run_in_threadpool(_count_spooled_pages, file)
+    except ValueError as e:
+        await run_in_threadpool(upload.abort)
+        raise HTTPException(status_code=422, detail=str(e))
+    if pages > settings.OCR_STATEMENT_MAX_PAGES:
+        await run_in_threadpool(upload.abort)
+        raise HTTPException(
+            status_code=400,
+            detail=f"A statement can have at most {settings.OCR_STATEMENT_MAX_PAGES} pages.",
         )
-    else:
-        return JSONResponse(
-            {
-                "task_id": task_id,
-                "status": task_result.state.lower(),
-                "message": "Task is in an unknown state.",
-            }
+
+    # One admission slot per page; released again if the pages never queue
+    task_ids = [str(uuid.uuid4()) for _ in range(pages)]
+    try:
+        await _reserve(_admission_owner(request, current_user), task_ids)
+    except BaseException:
+        await _abort_uploads([upload])
+        raise
+    pdf_ref = None
+    queued = False
+    try:
+        pdf_ref = await run_in_threadpool(upload.commit, image_hash)
+
+        # The manifest must exist before any page task can report back
+        statement_id = str(uuid.uuid4())
+        await StatementService.save_manifest(
+            statement_id,
+            {"filename": file.filename, "pages": pages, "task_ids": task_ids},
+            celery_app.conf.result_expires,
         )
+        group(
+            process_statement_page_task.s(statement_id, pdf_ref, page, pages).set(
+                task_id=task_id
+            )
+            for page, task_id in enumerate(task_ids, start=1)
+        ).apply_async()
+        queued = True
+    finally:
+        if not queued:
+            if pdf_ref is None:
+                await _abort_uploads([upload])
+            else:
+                await _discard_images([pdf_ref])
+            await _release(task_ids)
+
+    return JSONResponse(
+        {
+            "statement_id": statement_id,
+            "status": "processing",
+            "pages": pages,
+            "message": "Statement OCR processing has been initiated.",
+        }
+    )
+
+
+async def _statement_status(statement_id: str) -> dict:
+    manifest = await StatementService.load_manifest(statement_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Statement not found or expired.")
+
+    task_statuses = await fetch_task_statuses(manifest["task_ids"])
+    pages = []
+    transactions = []
+    for page, task_id in enumerate(manifest["task_ids"], start=1):
+        status = task_statuses[task_id]
+        pages.append({"page": page, "status": status["status"]})
+        if status["status"] == "completed":
+            transactions.extend(status["result"]["transactions"])
+
+    finished = sum(1 for p in pages if p["status"] in ("completed", "failed"))
+    return {
+        "statement_id": statement_id,
+        "status": "completed" if finished == len(pages) else "processing",
+        "pages": len(pages),
+        "pages_done": finished,
+        "page_statuses": pages,
+        "transactions": transactions,
+    }
+
+
+@router.get("/statement-status/{statement_id}")
+async def get_statement_status(statement_id: str):
+    """
+    Endpoint to check a PDF statement's per-page progress.
+    Returns the transactions of every page finished so far, in page order.
+    """
+    return JSONResponse(await _statement_status(statement_id))
+
+
+@router.get("/statement-events/{statement_id}")
+async def stream_statement(statement_id: str):
+    """
+    Server-Sent Events stream of a PDF statement.
+    Emits the current status, then one event per finished page with its
+    transactions, then a final completed event. A page finished while the
+    stream was opening can appear in both; clients dedupe by page number.
+    """
+    if await StatementService.load_manifest(statement_id) is None:
+        raise HTTPException(status_code=404, detail="Statement not found or expired.")
+
+    async def event_source():
+        async for payload in stream_task_events(statement_id, _statement_status):
+            if payload is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Endpoint to report OCR result cache hit/miss counters and size.
+    Admin access required.
+    """
+    return JSONResponse(await run_in_threadpool(ocr_result_cache.stats))
+
+
+@router.get("/metrics")
+async def get_ocr_metrics(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Endpoint to report OCR latency histograms over the last
+    OCR_METRICS_WINDOW_MINUTES: count, mean and p50/p95/p99 of every
+    pipeline stage in milliseconds, plus image size in KB and megapixels.
+    Admin access required.
+    """
+    return JSONResponse(await run_in_threadpool(ocr_metrics.summary))
+
+
+@router.get("/admission-stats")
+async def get_admission_stats(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Endpoint to report OCR admission control: tasks in flight, messages
+    waiting on the default and priority queues, and the configured limits.
+    Admin access required.
+    """
+    return JSONResponse(await run_in_threadpool(ocr_admission.stats))
+
+
+@router.get("/template-stats")
+async def get_template_stats(current_admin: Principal = Depends(get_current_admin)):
+    """
+    Endpoint to report per-template hit rate and extraction success rate.
+    Admin access required.
+    """
+    return JSONResponse(await run_in_threadpool(template_registry.stats))
+
+
+@router.get("/task-status/{task_id}")
+async def get_task_status(task_id: str):
+    """
+    Endpoint to check the status of an OCR processing task.
+    Returns the status and result if completed.
+    """
+    return JSONResponse(await fetch_task_status(task_id))
+
+
+@router.post("/task-status")
+async def get_task_statuses(payload: TaskStatusBulkRequest):
+    """
+    Endpoint to check the status of many OCR tasks in one call.
+    Returns a map of task ID to the same payload as /task-status/{task_id}.
+    """
+    return JSONResponse({"statuses": await fetch_task_statuses(payload.task_ids)})
+
+
+@router.get("/task-events/{task_id}")
+async def stream_task_status(task_id: str):
+    """
+    Server-Sent Events stream of an OCR task's status.
+    Emits the current status, then every transition until the task
+    completes or fails.
+    """
+
+    async def event_source():
+        async for payload in stream_task_events(task_id, fetch_task_status):
+            if payload is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws/task/{task_id}")
+async def task_status_websocket(websocket: WebSocket, task_id: str):
+    """
+    WebSocket variant of the task event stream; sends one JSON message per
+    status change and closes once the task completes or fails.
+    """
+    await websocket.accept()
+    try:
+        async for payload in stream_task_events(task_id, fetch_task_status):
+            if payload is not None:
+                await websocket.send_json(payload)
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
 
 
 @router.delete("/delete-task/{task_id}")
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi_mail import NameEmail
 from fastapi import BackgroundTasks
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
-from uuid import uuid4
 from datetime import timedelta
 
-from app.core.db import get_session
+from app.core.db import get_async_session
 from app.models.user_model import User
 from app.schemas.user_schema import (
     UserCreate,
@@ -17,11 +16,13 @@ from app.schemas.user_schema import (
     LoginRequest,
     UserPasswordChange,
 )
+from app.services.principal_cache import Principal, principal_cache
+from app.services.refresh_tokens import refresh_tokens
+from app.services.password_hasher import password_hasher
 from app.services.user_service import UserService
-from app.api.dependencies.auth import get_current_user
+from app.api.dependencies.auth import get_current_principal, get_current_user
 from app.core.security import (
     create_access_token,
-    verify_password,
     create_url_safe_token,
 )
 from app.services.email_notify import (
@@ -29,7 +30,6 @@ from app.services.email_notify import (
     send_registration_notification,
 )
 from app.core.config import settings
-from app.core.redis_client import redis_client
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -43,21 +43,23 @@ user_service = UserService()
 async def register_user(
     user_in: UserCreate,
     background_tasks: BackgroundTasks,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a new user.
     """
 
     user_email = user_in.email
-    user_exists = user_service.get_user_by_email(session=session, email=user_email)
+    user_exists = await user_service.get_user_by_email(
+        session=session, email=user_email
+    )
     if user_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email already exists.",
         )
     # Create the user
-    new_user = user_service.create_user(session=session, user_in=user_in)
+    new_user = await user_service.create_user(session=session, user_in=user_in)
 
     # Send welcome email and verification link
     verification_token = create_url_safe_token(data={"email": new_user.email})
@@ -78,13 +80,17 @@ async def register_user(
 async def login_user(
     reponse: Response,
     login_data: LoginRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Authenticate user and return user details.
     """
-    user = user_service.get_user_by_email(session=session, email=login_data.email)
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    user = await user_service.get_user_by_email(
+        session=session, email=login_data.email
+    )
+    if not user or not await password_hasher.verify(
+        login_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -97,12 +103,8 @@ async def login_user(
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
-    # Generate refresh token
-    refresh_token = str(uuid4())
-    redis_key = f"refresh_token:{refresh_token}"
-    redis_client.set(
-        redis_key, str(user.id), ex=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    )  # Store refresh token
+    # Generate and store refresh token
+    refresh_token = await refresh_tokens.issue(user.id)
 
     # set refresh token in httpOnly cookie
     is_production = settings.ENVIRONMENT == "production"
@@ -142,13 +144,13 @@ async def get_current_user_info(
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user(
     user_in: UserUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Update the current authenticated user's information.
     """
-    user = user_service.update_user(
+    user = await user_service.update_user(
         session=session, db_user=current_user, user_in=user_in
     )
     return user
@@ -156,27 +158,29 @@ async def update_current_user(
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_current_user(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Delete the current authenticated user's account.
     """
-    session.delete(current_user)
-    session.commit()
+    await session.delete(current_user)
+    await principal_cache.invalidate(current_user.id)
+    await session.commit()
+    await refresh_tokens.revoke_all(current_user.id)
     return None
 
 
 @router.post("/me/reset-password", status_code=status.HTTP_200_OK, tags=["password"])
 async def reset_password(
     email: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Initiate password reset process for the user.
     """
     try:
-        user = user_service.get_user_by_email(session=session, email=email)
+        user = await user_service.get_user_by_email(session=session, email=email)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -203,19 +207,21 @@ async def reset_password(
 @router.post("/me/change-password", status_code=status.HTTP_200_OK, tags=["password"])
 async def change_password(
     payload: UserPasswordChange,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Change the current authenticated user's password.
     """
-    if not verify_password(payload.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(
+        payload.current_password, current_user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect",
         )
 
-    user_service.change_user_password(
+    await user_service.change_user_password(
         session=session, user=current_user, new_password=payload.new_password
     )
     return {"msg": "Password changed successfully."}
@@ -231,12 +237,25 @@ async def logout_user(
     """
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token:
-        redis_key = f"refresh_token:{refresh_token}"
-        redis_client.delete(redis_key)
+        await refresh_tokens.revoke(refresh_token)
         response.delete_cookie(key="refresh_token")
     return {"msg": "Successfully logged out."}
 
 
+@router.post("/logout-all", status_code=status.HTTP_200_OK)
+async def logout_all_sessions(
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Logout the current user from every device by revoking all of their
+    refresh tokens. Access tokens already issued stay valid until they expire.
+    """
+    revoked = await refresh_tokens.revoke_all(current_user.id)
+    response.delete_cookie(key="refresh_token")
+    return {"msg": "Successfully logged out everywhere.", "sessions": revoked}
+
+
 # -----------------------------
 # Dynamic routes last
 # -----------------------------
@@ -245,8 +264,8 @@ async def logout_user(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: UUID,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),  # Added authentication
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_principal),  # Added authentication
 ):
     """
     Retrieve a user by ID (requires authentication).
@@ -255,7 +274,7 @@ async def get_user_by_id(
         - Admins can view any user's details.
         - Public profiles (is_public=True) can be viewed by anyone.
     """
-    user = user_service.get_user_by_id(session=session, user_id=user_id)
+    user = await user_service.get_user_by_id(session=session, user_id=user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
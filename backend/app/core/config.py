@@ -49,6 +49,22 @@ class Settings(BaseSettings):
     # Expire duration: 30 minutes (short-lived; refresh token handles longevity)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Claims of verified access tokens are kept per process until the
+    # token's exp, so repeat requests skip the signature check
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+    # Authenticated users are resolved from a per-process LRU, then a Redis
+    # hash, before the user table; the local TTL bounds how long another
+    # process can serve a principal after it was invalidated
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_LOCAL_MAX_ENTRIES: int = 4096
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 15 * 60
+    # bcrypt runs on a dedicated thread pool; defaults to half the available
+    # CPUs so a burst of logins cannot starve the rest of the API. Callers
+    # beyond the workers plus this queue get 503
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
     FRONTEND_HOST: str = "http://localhost:3000"
     BACKEND_HOST: str = "http://localhost:8001"
     ENVIRONMENT: Literal["local", "production", "staging"] = "local"
@@ -80,6 +96,9 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = "yugantar_db"
+    # Connection pool of the async engine used by async routes
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -159,6 +178,10 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str | None = None
     REDIS_DB: int = 0
+    # Connections shared by the asyncio client; callers wait up to the
+    # timeout for a free one instead of failing when all are in use
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -172,6 +195,56 @@ class Settings(BaseSettings):
             path=f"/{self.REDIS_DB or ''}",
         )
 
+    # ---------------------------
+    # OCR Settings
+    # ---------------------------
+    # Parsed results are cached by image SHA-256 so re-uploads skip tesseract
+    OCR_CACHE_ENABLED: bool = True
+    OCR_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    OCR_CACHE_MAX_ENTRIES: int = 5000
+    # Perceptual-hash lookup of re-encoded or cropped copies of old receipts
+    OCR_DUPLICATE_DETECTION_ENABLED: bool = True
+    OCR_DUPLICATE_MAX_DISTANCE: int = 6  # Hamming distance out of 64 bits
+    OCR_DUPLICATE_TTL_SECONDS: int = 90 * 24 * 60 * 60
+    # How uploaded images reach the OCR workers: "redis" passes the bytes
+    # through a Redis key, "blob" uses a content-addressed directory that
+    # web and worker containers must share
+    OCR_IMAGE_TRANSPORT: Literal["redis", "blob"] = "redis"
+    OCR_IMAGE_TTL_SECONDS: int = 30 * 60
+    OCR_BLOB_STORE_DIR: str = "/tmp/ocr_uploads"
+    # Resize/binarize/deskew/crop before tesseract; off keeps the original path
+    OCR_PREPROCESS_ENABLED: bool = False
+    # JSON file of known receipt layouts OCR'd on fixed field regions only
+    OCR_TEMPLATES_ENABLED: bool = True
+    OCR_TEMPLATE_FILE: str | None = None
+    # "auto" keeps a tesserocr handle per worker if installed, else pytesseract.
+    # tesserocr is opt-in (worker image build arg INSTALL_TESSEROCR=true);
+    # "tesserocr" stops the worker from starting when it is not installed
+    OCR_ENGINE: Literal["auto", "tesserocr", "pytesseract"] = "auto"
+    OCR_BATCH_MAX_FILES: int = 100
+    # Upload quality gate; thresholds apply to a ~500px wide grayscale thumbnail
+    OCR_QUALITY_GATE_ENABLED: bool = True
+    OCR_MIN_IMAGE_SIDE: int = 300
+    OCR_MIN_BLUR_VARIANCE: float = 50.0
+    OCR_MIN_TEXT_DENSITY: float = 0.005  # fraction of edge pixels
+    # Fields read below this word confidence (0-100) get a targeted second pass
+    OCR_SECOND_PASS_ENABLED: bool = True
+    OCR_FIELD_MIN_CONFIDENCE: float = 60.0
+    # PDF statements are rendered and OCR'd one page per subtask
+    OCR_STATEMENT_MAX_PAGES: int = 50
+    OCR_STATEMENT_DPI: int = 200
+    # Latency histograms and the Retry-After estimate cover this many minutes
+    OCR_METRICS_WINDOW_MINUTES: int = 15
+    # Admission control; uploads beyond these limits get 429 + Retry-After
+    OCR_ADMISSION_ENABLED: bool = True
+    OCR_MAX_INFLIGHT_TASKS: int = 200
+    OCR_MAX_TASKS_PER_USER: int = 5
+    # Treasurer batch jobs; workers drain it before the default queue
+    OCR_PRIORITY_QUEUE: str = "ocr_priority"
+    # Worker sizing; processes default to available CPUs / threads per process
+    OCR_WORKER_PROCESSES: int | None = None
+    OCR_THREADS_PER_PROCESS: int = 1
+
 
 settings = Settings()
 print(
@@ -1,5 +1,7 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlmodel import Session, create_engine, select
-from typing import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Generator
 
 from .config import settings
 from app.models.user_model import User
@@ -7,8 +9,24 @@ from app.schemas.user_schema import UserCreate
 from app.services.user_service import UserService
 
 
+# Sync engine for Celery tasks, scripts and plain ``def`` routes, which
+# FastAPI already runs in its threadpool
 engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
+# Async engine for ``async def`` routes; the postgresql+psycopg URL selects
+# psycopg's async driver here
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+)
+# Objects stay loaded after commit: an expired attribute would need a lazy
+# load, which AsyncSession cannot do implicitly
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 
 # ------------------
 # Dependency for FastAPI routes
@@ -23,15 +41,22 @@ def get_session() -> Generator[Session, None, None]:
             session.close()
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yields a new async database session."""
+
+    async with async_session_factory() as session:
+        yield session
+
+
 # ------------------
 # Initialize the database with the first superuser
 # ------------------
 
 
-def init_db(session: Session):
+async def init_db(session: AsyncSession):
 
-    user = session.exec(
-        select(User).where(User.email == settings.ADMIN_EMAIL)
+    user = (
+        await session.exec(select(User).where(User.email == settings.ADMIN_EMAIL))
     ).first()
     if not user:
         user_in = UserCreate(
@@ -41,7 +66,7 @@ def init_db(session: Session):
             is_active=True,
         )
         service = UserService()
-        user = service.create_user(session=session, user_in=user_in)
+        user = await service.create_user(session=session, user_in=user_in)
         print("Created first superuser", user.email)
     else:
         print("Superuser already exists", user.email)
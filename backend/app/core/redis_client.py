@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 from app.core.config import settings
 
 redis_client = redis.Redis(
@@ -8,3 +9,36 @@ redis_client = redis.Redis(
     db=settings.REDIS_DB,
     decode_responses=True,  # Ensures responses are in string format
 )
+
+# Binary-safe client for payloads such as uploaded images
+redis_bytes_client = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    db=settings.REDIS_DB,
+)
+
+# Pool behind the asyncio client, sized explicitly so a traffic burst
+# queues for a connection rather than opening one per request
+async_redis_pool = redis.asyncio.BlockingConnectionPool(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    db=settings.REDIS_DB,
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+)
+
+# asyncio client for use inside async handlers (auth, caches)
+async_redis_client = redis.asyncio.Redis(connection_pool=async_redis_pool)
+
+# Pub/sub streams hold their connection for as long as a client listens,
+# so they get their own client rather than draining the bounded pool
+async_pubsub_client = redis.asyncio.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+    db=settings.REDIS_DB,
+    decode_responses=True,
+)
@@ -2,8 +2,12 @@
 Adapted from fastapi repository: https://github.com/fastapi/full-stack-fastapi-template/blob/master/backend/app/core/security.py
 """
 
+import hashlib
+import threading
+import time
 import jwt
 import bcrypt
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from itsdangerous import URLSafeTimedSerializer
@@ -51,15 +55,80 @@ async def create_refresh_token(subject: str | Any, expires_delta: timedelta) ->
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of claims from tokens whose signature already checked out,
+    keyed by a SHA-256 digest of the token so raw tokens are not kept.
+    Entries are dropped once the token's ``exp`` passes; tokens without
+    ``exp`` are never cached.
+    """
+
+    def __init__(self, max_entries: int = settings.JWT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # token digest -> (exp, claims), least recently used first
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        # Sync routes resolve dependencies on worker threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Cached claims, raising ExpiredSignatureError once past ``exp``."""
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            exp, claims = entry
+            if exp <= time.time():
+                del self._entries[key]
+                raise jwt.ExpiredSignatureError("Signature has expired")
+            self._entries.move_to_end(key)
+            return dict(claims)
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+def verify_and_decode(token: str) -> dict[str, Any]:
+    """
+    Verify a JWT's signature and expiry and return its claims.
+
+    Every caller goes through here so a token is verified once per process
+    and later requests with it are served from ``verified_tokens``. Raises
+    the same ``jwt.PyJWTError`` subclasses as ``jwt.decode``.
+    """
+    if settings.JWT_CACHE_ENABLED:
+        claims = verified_tokens.get(token)
+        if claims is not None:
+            return claims
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if settings.JWT_CACHE_ENABLED:
+        verified_tokens.set(token, claims)
+    return claims
+
+
 def decode_access_token(token: str) -> dict[str, Any]:
     """
     Decode a JWT access token.
     """
     try:  # decode the token
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        return payload
+        return verify_and_decode(token)
     except jwt.PyJWTError:
         raise ValueError("Invalid token")
 
@@ -69,9 +138,7 @@ def token_expired(token: str) -> bool:
     Check if a JWT token has expired.
     """
     try:  # decode the token to get expiration time
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = verify_and_decode(token)
         exp = payload.get("exp")
         if exp is None:
             return True
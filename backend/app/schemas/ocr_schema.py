@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel, Field
+from typing import List
+
+
+class TaskStatusBulkRequest(SQLModel):
+    """Task ids whose OCR status should be fetched in one call."""
+
+    task_ids: List[str] = Field(min_length=1, max_length=100)
@@ -0,0 +1,117 @@
+"""
+Concurrency load test for the API.
+
+Signs in once, then sends the same authenticated GET from an increasing
+number of concurrent clients and reports requests/sec and latency
+percentiles at each level. Requests/sec that keeps rising with concurrency
+means the route is not serialised on the event loop; a route that blocks
+the loop (e.g. sync database calls in an ``async def``) flattens out at
+one worker's single-request rate.
+
+Usage: python -m app.scripts.api_load_test [--base-url URL] [--path PATH]
+           [--concurrency 1,8,32,64] [--requests N]
+           [--email EMAIL] [--password PASSWORD]
+Defaults to GET /api/v1/users/me on http://localhost:8000 as the admin user.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.core.config import settings
+
+
+def _pop_option(args: list[str], name: str, default: str) -> str:
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i : i + 2]
+        return value
+    return default
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        "/api/v1/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def _run_level(
+    client: httpx.AsyncClient, path: str, concurrency: int, total: int
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests_per_sec": round(total / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies), 1),
+        "p50_ms": round(_percentile(latencies, 0.50), 1),
+        "p95_ms": round(_percentile(latencies, 0.95), 1),
+        "p99_ms": round(_percentile(latencies, 0.99), 1),
+        "errors": errors,
+    }
+
+
+async def main(args: list[str]) -> None:
+    base_url = _pop_option(args, "--base-url", "http://localhost:8000")
+    path = _pop_option(args, "--path", "/api/v1/users/me")
+    levels = [
+        int(c) for c in _pop_option(args, "--concurrency", "1,8,32,64").split(",")
+    ]
+    total = int(_pop_option(args, "--requests", "500"))
+    email = _pop_option(args, "--email", str(settings.ADMIN_EMAIL))
+    password = _pop_option(args, "--password", settings.ADMIN_PASSWORD)
+
+    limits = httpx.Limits(max_connections=max(levels))
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60
+    ) as client:
+        token = await _login(client, email, password)
+        client.headers["Authorization"] = f"Bearer {token}"
+        # Warm up connections and the server's pools
+        await _run_level(client, path, max(levels), max(levels))
+
+        print(f"GET {path}, {total} requests per level")
+        baseline = None
+        for concurrency in levels:
+            result = await _run_level(client, path, concurrency, total)
+            baseline = baseline or result["requests_per_sec"]
+            speedup = result["requests_per_sec"] / baseline
+            print(
+                f"  concurrency {concurrency:4d}: "
+                f"{result['requests_per_sec']:8.1f} req/s ({speedup:.1f}x)  "
+                f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+                f"p99 {result['p99_ms']} ms  errors {result['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
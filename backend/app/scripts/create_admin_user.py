@@ -1,10 +1,9 @@
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from app.core.db import engine
 from app.models.user_model import User, AccessRole
 from app.core.security import get_password_hash
 from app.core.config import settings
-from app.services.user_service import UserService
 
 
 def create_admin_user(email: str, password: str) -> None:
@@ -13,9 +12,7 @@ def create_admin_user(email: str, password: str) -> None:
     """
     # get a database session
     with Session(engine) as session:
-        user_service = UserService()
-
-        existing_user = user_service.get_user_by_email(session, email)
+        existing_user = session.exec(select(User).where(User.email == email)).first()
         if existing_user:
             print("Admin user already exists.")
             return
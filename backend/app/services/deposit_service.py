@@ -1,7 +1,8 @@
 import uuid
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
 
 from app.models.policy.deposit_policy import DepositPolicy
@@ -12,7 +13,8 @@ from app.schemas.deposit_schema import (
     DepositModeratorUpdate,
 )
 from app.services.receipt_service import ReceiptService
-from app.models.user_model import User, CooperativeRole
+from app.models.user_model import CooperativeRole
+from app.services.principal_cache import Principal
 from app.utils.deposit_date_utils import (
     calculate_due_date,
     calculate_late_fine,
@@ -28,13 +30,13 @@ class DepositService:
     Service class for managing deposits.
     """
 
-    def create_deposit(
+    async def create_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_in: DepositCreate,
         user_id: uuid.UUID,
     ) -> Deposit:
-        policy = session.get(DepositPolicy, deposit_in.policy_id)
+        policy = await session.get(DepositPolicy, deposit_in.policy_id)
         if not policy:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -81,14 +83,14 @@ class DepositService:
             session.add(fine)
 
         session.add(new_deposit)
-        session.commit()
-        session.refresh(new_deposit)
+        await session.commit()
+        await session.refresh(new_deposit)
 
         return new_deposit
 
-    def user_update_deposit(
+    async def user_update_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_id: uuid.UUID,
         deposit_in: DepositUserUpdate,
         user_id: uuid.UUID,
@@ -101,7 +103,7 @@ class DepositService:
             Deposit.id == deposit_id,
             Deposit.user_id == user_id,
         )
-        db_deposit = session.exec(statement).first()
+        db_deposit = (await session.exec(statement)).first()
 
         if not db_deposit:
             raise HTTPException(
@@ -114,17 +116,17 @@ class DepositService:
             setattr(db_deposit, key, value)
 
         session.add(db_deposit)
-        session.commit()
-        session.refresh(db_deposit)
+        await session.commit()
+        await session.refresh(db_deposit)
 
         return db_deposit
 
-    def verify_deposit(
+    async def verify_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_id: uuid.UUID,
         deposit_in: DepositModeratorUpdate,
-        current_user: User,
+        current_user: Principal,
     ) -> Deposit:
         """
         Moderator update for an existing deposit.
@@ -135,7 +137,7 @@ class DepositService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient privileges",
             )
-        deposit = session.get(Deposit, deposit_id)
+        deposit = await session.get(Deposit, deposit_id)
         if not deposit:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -151,14 +153,14 @@ class DepositService:
         deposit.verification_status = deposit_in.verification_status
         deposit.verified_by = f"{current_user.first_name} {current_user.last_name}"
         session.add(deposit)
-        session.commit()
-        session.refresh(deposit)
+        await session.commit()
+        await session.refresh(deposit)
 
         return deposit
 
-    def get_deposit(
+    async def get_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_id: uuid.UUID,
     ) -> Optional[Deposit]:
         """
@@ -166,7 +168,7 @@ class DepositService:
         """
 
         statement = select(Deposit).where(Deposit.id == deposit_id)
-        db_deposit = session.exec(statement).first()
+        db_deposit = (await session.exec(statement)).first()
 
         if not db_deposit:
             raise HTTPException(
@@ -176,9 +178,9 @@ class DepositService:
 
         return db_deposit
 
-    def get_upcoming_deposits(
+    async def get_upcoming_deposits(
         self,
-        session: Session,
+        session: AsyncSession,
         user_id: uuid.UUID,
         days_ahead: int = 7,
     ) -> list[Deposit]:
@@ -200,13 +202,13 @@ class DepositService:
             .order_by(Deposit.due_deposit_date)
         )  # typing: ignore
 
-        result = session.exec(statement).all()
+        result = (await session.exec(statement)).all()
 
         return list(result)
 
-    def user_delete_deposit(
+    async def user_delete_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_id: uuid.UUID,
         user_id: uuid.UUID,
     ) -> None:
@@ -218,7 +220,7 @@ class DepositService:
             Deposit.id == deposit_id,
             Deposit.user_id == user_id,
         )
-        deposit = session.exec(statement).first()
+        deposit = (await session.exec(statement)).first()
 
         if not deposit:
             raise HTTPException(
@@ -231,14 +233,14 @@ class DepositService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot delete a verified deposit",
             )
-        session.delete(deposit)
-        session.commit()
+        await session.delete(deposit)
+        await session.commit()
 
-    def moderator_delete_deposit(
+    async def moderator_delete_deposit(
         self,
-        session: Session,
+        session: AsyncSession,
         deposit_id: uuid.UUID,
-        current_user: User,
+        current_user: Principal,
     ) -> None:
         """
         Delete a deposit by its ID.
@@ -250,12 +252,12 @@ class DepositService:
                 detail="Insufficient privileges",
             )
 
-        deposit = session.get(Deposit, deposit_id)
+        deposit = await session.get(Deposit, deposit_id)
         if not deposit:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Deposit not found",
             )
 
-        session.delete(deposit)
-        session.commit()
+        await session.delete(deposit)
+        await session.commit()
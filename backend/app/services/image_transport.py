@@ -0,0 +1,196 @@
+"""
+Transports that hand uploaded receipt images from the web app to the OCR
+workers without a shared upload directory.
+
+The web side streams an upload into an ``ImageUpload`` and commits it to get
+a handle such as ``redis:<id>`` or ``blob:<sha256>``. The handle is what gets
+queued; the worker resolves it back to bytes with ``load_image_bytes``.
+"""
+
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_bytes_client
+
+
+class ImageUpload(ABC):
+    """An in-progress upload; written in chunks, then committed or aborted."""
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None: ...
+
+    @abstractmethod
+    def commit(self, image_hash: str) -> str:
+        """Finish the upload and return the handle to queue."""
+
+    @abstractmethod
+    def abort(self) -> None: ...
+
+
+class ImageTransport(ABC):
+    name: str
+
+    @abstractmethod
+    def open_upload(self) -> ImageUpload: ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes: ...
+
+    @abstractmethod
+    def discard(self, key: str) -> None: ...
+
+
+class _RedisImageUpload(ImageUpload):
+    def __init__(self, transport: "RedisImageTransport"):
+        self.transport = transport
+        self.key = uuid.uuid4().hex
+        self._started = False
+
+    def write(self, chunk: bytes) -> None:
+        redis_key = self.transport._redis_key(self.key)
+        pipe = self.transport.client.pipeline(transaction=False)
+        pipe.append(redis_key, chunk)
+        if not self._started:
+            # Make sure an abandoned upload never outlives the TTL
+            pipe.expire(redis_key, self.transport.ttl_seconds)
+            self._started = True
+        pipe.execute()
+
+    def commit(self, image_hash: str) -> str:
+        self.transport.client.expire(
+            self.transport._redis_key(self.key), self.transport.ttl_seconds
+        )
+        return f"{self.transport.name}:{self.key}"
+
+    def abort(self) -> None:
+        self.transport.client.delete(self.transport._redis_key(self.key))
+
+
+class RedisImageTransport(ImageTransport):
+    """Pass image bytes through a Redis key that expires after a TTL."""
+
+    name = "redis"
+    KEY_PREFIX = "ocr_image"
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_bytes_client,
+        ttl_seconds: int = settings.OCR_IMAGE_TTL_SECONDS,
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{key}"
+
+    def open_upload(self) -> ImageUpload:
+        return _RedisImageUpload(self)
+
+    def get(self, key: str) -> bytes:
+        data = self.client.get(self._redis_key(key))
+        if data is None:
+            raise FileNotFoundError(f"Image {key} has expired or does not exist")
+        return data
+
+    def discard(self, key: str) -> None:
+        self.client.delete(self._redis_key(key))
+
+
+class _BlobImageUpload(ImageUpload):
+    def __init__(self, transport: "BlobStoreImageTransport"):
+        self.transport = transport
+        self.tmp_path = transport.root / f".upload-{uuid.uuid4().hex}"
+        self._file = open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self, image_hash: str) -> str:
+        self._file.close()
+        path = self.transport._blob_path(image_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.tmp_path, path)
+        return f"{self.transport.name}:{image_hash}"
+
+    def abort(self) -> None:
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class BlobStoreImageTransport(ImageTransport):
+    """
+    Content-addressed directory of images named by SHA-256.
+
+    Identical uploads share one blob, so workers never delete blobs on
+    completion; ``prune`` removes blobs older than the TTL instead.
+    """
+
+    name = "blob"
+
+    def __init__(
+        self,
+        root: str = settings.OCR_BLOB_STORE_DIR,
+        ttl_seconds: int = settings.OCR_IMAGE_TTL_SECONDS,
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+    def _blob_path(self, image_hash: str) -> Path:
+        return self.root / image_hash[:2] / image_hash
+
+    def open_upload(self) -> ImageUpload:
+        return _BlobImageUpload(self)
+
+    def get(self, key: str) -> bytes:
+        return self._blob_path(key).read_bytes()
+
+    def discard(self, key: str) -> None:
+        # Another in-flight task may share this blob; leave it to prune()
+        pass
+
+    def prune(self) -> int:
+        """Remove blobs and abandoned uploads older than the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        removed = 0
+        for path in self.root.rglob("*"):
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+_TRANSPORTS: dict[str, type[ImageTransport]] = {
+    RedisImageTransport.name: RedisImageTransport,
+    BlobStoreImageTransport.name: BlobStoreImageTransport,
+}
+_instances: dict[str, ImageTransport] = {}
+
+
+def get_image_transport(name: str = settings.OCR_IMAGE_TRANSPORT) -> ImageTransport:
+    if name not in _instances:
+        if name not in _TRANSPORTS:
+            raise ValueError(f"Unknown OCR image transport: {name}")
+        _instances[name] = _TRANSPORTS[name]()
+    return _instances[name]
+
+
+def _resolve(handle: str) -> tuple[ImageTransport, str]:
+    name, _, key = handle.partition(":")
+    return get_image_transport(name), key
+
+
+def load_image_bytes(handle: str) -> bytes:
+    transport, key = _resolve(handle)
+    return transport.get(key)
+
+
+def discard_image(handle: str) -> None:
+    transport, key = _resolve(handle)
+    transport.discard(key)
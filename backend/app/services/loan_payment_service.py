@@ -1,7 +1,8 @@
 import uuid
 from typing import Optional, List
 from fastapi import HTTPException, status
-from sqlmodel import Session, select, func
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timezone
 from decimal import Decimal
 
@@ -11,23 +12,23 @@ from app.schemas.loan_payment_schema import (
     LoanPaymentCreate,
     LoanPaymentUpdate,
 )
-from app.models.user_model import User
+from app.services.principal_cache import Principal
 from app.models.mixins.money import MoneyMixin
 
 
 class LoanPaymentService:
     """Service class for managing loan payments."""
 
-    def create_payment(
+    async def create_payment(
         self,
-        session: Session,
+        session: AsyncSession,
         payment_in: LoanPaymentCreate,
         user_id: uuid.UUID,
     ) -> LoanPayment:
         """Create a new loan payment."""
 
         # Verify the loan exists and belongs to the user
-        loan = session.get(Loan, payment_in.loan_id)
+        loan = await session.get(Loan, payment_in.loan_id)
         if not loan:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -61,20 +62,20 @@ class LoanPaymentService:
 
         session.add(payment)
         session.add(loan)
-        session.commit()
-        session.refresh(payment)
-        session.refresh(loan)
+        await session.commit()
+        await session.refresh(payment)
+        await session.refresh(loan)
 
         return payment
 
-    def get_payment(
+    async def get_payment(
         self,
-        session: Session,
+        session: AsyncSession,
         payment_id: uuid.UUID,
     ) -> LoanPayment:
         """Retrieve a single payment by ID."""
 
-        payment = session.get(LoanPayment, payment_id)
+        payment = await session.get(LoanPayment, payment_id)
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -82,9 +83,9 @@ class LoanPaymentService:
             )
         return payment
 
-    def get_payments_for_loan(
+    async def get_payments_for_loan(
         self,
-        session: Session,
+        session: AsyncSession,
         loan_id: uuid.UUID,
         skip: int = 0,
         limit: int = 50,
@@ -92,7 +93,7 @@ class LoanPaymentService:
         """Retrieve all payments for a specific loan."""
 
         # Verify loan exists
-        loan = session.get(Loan, loan_id)
+        loan = await session.get(Loan, loan_id)
         if not loan:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -105,7 +106,7 @@ class LoanPaymentService:
             .select_from(LoanPayment)
             .where(LoanPayment.loan_id == loan_id)
         )
-        total = session.exec(count_stmt).one()
+        total = (await session.exec(count_stmt)).one()
 
         # Fetch paginated
         statement = (
@@ -115,13 +116,13 @@ class LoanPaymentService:
             .offset(skip)
             .limit(limit)
         )
-        payments = session.exec(statement).all()
+        payments = (await session.exec(statement)).all()
 
         return list(payments), total
 
-    def get_my_payments(
+    async def get_my_payments(
         self,
-        session: Session,
+        session: AsyncSession,
         user_id: uuid.UUID,
         skip: int = 0,
         limit: int = 50,
@@ -130,7 +131,7 @@ class LoanPaymentService:
 
         # Get all loan IDs for the user
         loan_ids_stmt = select(Loan.id).where(Loan.user_id == user_id)
-        loan_ids = session.exec(loan_ids_stmt).all()
+        loan_ids = (await session.exec(loan_ids_stmt)).all()
 
         if not loan_ids:
             return [], 0
@@ -141,7 +142,7 @@ class LoanPaymentService:
             .select_from(LoanPayment)
             .where(LoanPayment.loan_id.in_(loan_ids))
         )
-        total = session.exec(count_stmt).one()
+        total = (await session.exec(count_stmt)).one()
 
         # Fetch paginated
         statement = (
@@ -151,20 +152,20 @@ class LoanPaymentService:
             .offset(skip)
             .limit(limit)
         )
-        payments = session.exec(statement).all()
+        payments = (await session.exec(statement)).all()
 
         return list(payments), total
 
-    def update_payment(
+    async def update_payment(
         self,
-        session: Session,
+        session: AsyncSession,
         payment_id: uuid.UUID,
         payment_in: LoanPaymentUpdate,
         user_id: uuid.UUID,
     ) -> LoanPayment:
         """Update an existing loan payment (only by the owner, before any verification)."""
 
-        payment = session.get(LoanPayment, payment_id)
+        payment = await session.get(LoanPayment, payment_id)
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -172,7 +173,7 @@ class LoanPaymentService:
             )
 
         # Verify ownership through the loan
-        loan = session.get(Loan, payment.loan_id)
+        loan = await session.get(Loan, payment.loan_id)
         if not loan or loan.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -195,20 +196,20 @@ class LoanPaymentService:
             setattr(payment, key, value)
 
         session.add(payment)
-        session.commit()
-        session.refresh(payment)
+        await session.commit()
+        await session.refresh(payment)
 
         return payment
 
-    def delete_payment(
+    async def delete_payment(
         self,
-        session: Session,
+        session: AsyncSession,
         payment_id: uuid.UUID,
         user_id: uuid.UUID,
     ) -> None:
         """Delete a loan payment (only by the owner)."""
 
-        payment = session.get(LoanPayment, payment_id)
+        payment = await session.get(LoanPayment, payment_id)
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -216,7 +217,7 @@ class LoanPaymentService:
             )
 
         # Verify ownership through the loan
-        loan = session.get(Loan, payment.loan_id)
+        loan = await session.get(Loan, payment.loan_id)
         if not loan or loan.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -229,18 +230,18 @@ class LoanPaymentService:
             loan.total_paid_paisa = 0
 
         session.add(loan)
-        session.delete(payment)
-        session.commit()
+        await session.delete(payment)
+        await session.commit()
 
-    def moderator_delete_payment(
+    async def moderator_delete_payment(
         self,
-        session: Session,
+        session: AsyncSession,
         payment_id: uuid.UUID,
-        current_user: User,
+        current_user: Principal,
     ) -> None:
         """Delete a loan payment (moderator/treasurer)."""
 
-        payment = session.get(LoanPayment, payment_id)
+        payment = await session.get(LoanPayment, payment_id)
         if not payment:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -248,12 +249,12 @@ class LoanPaymentService:
             )
 
         # Reverse the payment from loan totals
-        loan = session.get(Loan, payment.loan_id)
+        loan = await session.get(Loan, payment.loan_id)
         if loan:
             loan.total_paid_paisa -= payment.amount_paisa
             if loan.total_paid_paisa < 0:
                 loan.total_paid_paisa = 0
             session.add(loan)
 
-        session.delete(payment)
-        session.commit()
+        await session.delete(payment)
+        await session.commit()
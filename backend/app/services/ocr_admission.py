@@ -0,0 +1,199 @@
+"""
+Admission control for the OCR queue.
+
+Every admitted OCR task is recorded in Redis sorted sets, one global and
+one per owner (a user, or the client IP for anonymous uploads), scored by
+admission time. The worker removes a task when it finishes, and entries
+older than ``STALE_AFTER_SECONDS`` are pruned, so a lost worker can never
+leak capacity for good. Uploads are refused with ``AdmissionDenied`` once
+the in-flight count or the broker's queue length reaches
+OCR_MAX_INFLIGHT_TASKS, or the owner already has OCR_MAX_TASKS_PER_USER
+tasks in flight. The limits are checked and the tasks recorded by one Lua
+script, so concurrent uploads cannot all pass the check before any of
+them is counted; callers release whatever they reserved but never
+queued. The suggested retry delay is derived from the mean task time over
+the OCR metrics window.
+
+Treasurer batch jobs skip these checks and go to OCR_PRIORITY_QUEUE, which
+workers drain before the default queue.
+"""
+
+import logging
+import math
+import time
+from typing import Optional
+
+import redis
+from celery.signals import task_postrun
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.ocr_metrics import ocr_metrics
+
+logger = logging.getLogger(__name__)
+
+# Tasks counted in flight: single receipts and statement pages
+ADMITTED_TASK_NAMES = {"perform_ocr_task", "ocr_statement_page_task"}
+# Longer than any task can wait in the queue plus its hard time limit
+STALE_AFTER_SECONDS = 30 * 60
+# Used for Retry-After until OCR timings have been recorded
+DEFAULT_TASK_SECONDS = 5.0
+MAX_RETRY_AFTER_SECONDS = 300
+# Stale entries pruned per reservation; keeps the script's work bounded
+PRUNE_BATCH = 500
+
+# KEYS: in-flight set, owner set, task -> owner hash
+# ARGV: now, stale cutoff, max in flight, max per owner, queue depth,
+# owner, owner set ttl, then the task ids. Returns {verdict, in flight,
+# excess}: verdict 0 reserved, 1 owner at its limit, 2 queue full
+_RESERVE_SCRIPT = f"""
+local stale = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], 0, ARGV[2], 'LIMIT', 0, {PRUNE_BATCH}
+)
+if #stale > 0 then
+    redis.call('ZREM', KEYS[1], unpack(stale))
+    redis.call('HDEL', KEYS[3], unpack(stale))
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[2], 0, ARGV[2])
+
+local count = #ARGV - 7
+local in_flight = redis.call('ZCARD', KEYS[1])
+local owner_in_flight = redis.call('ZCARD', KEYS[2])
+local per_owner = tonumber(ARGV[4])
+local owner_excess = owner_in_flight + math.min(count, per_owner) - per_owner
+if owner_excess > 0 then
+    return {{1, owner_in_flight, owner_excess}}
+end
+local load = math.max(in_flight, tonumber(ARGV[5]))
+local excess = load + count - tonumber(ARGV[3])
+if excess > 0 then
+    return {{2, load, excess}}
+end
+
+for i = 8, #ARGV do
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[i])
+    redis.call('ZADD', KEYS[2], ARGV[1], ARGV[i])
+    redis.call('HSET', KEYS[3], ARGV[i], ARGV[6])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[7])
+return {{0, in_flight + count, 0}}
+"""
+
+
+class AdmissionDenied(Exception):
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class OCRAdmission:
+    INFLIGHT_KEY = "ocr_admission:inflight"
+    OWNERS_KEY = "ocr_admission:owners"
+    OWNER_KEY_PREFIX = "ocr_admission:owner"
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        broker: Optional[redis.Redis] = None,
+    ):
+        self.client = client
+        self._broker = broker
+        self._reserve = client.register_script(_RESERVE_SCRIPT)
+
+    @property
+    def broker(self) -> redis.Redis:
+        if self._broker is None:
+            self._broker = redis.Redis.from_url(celery_app.conf.broker_url)
+        return self._broker
+
+    def _owner_key(self, owner: str) -> str:
+        return f"{self.OWNER_KEY_PREFIX}:{owner}"
+
+    def queue_depth(self, queue: Optional[str] = None) -> int:
+        """Messages waiting in a Celery queue (default queue if None)."""
+        return int(self.broker.llen(queue or celery_app.conf.task_default_queue))
+
+    @staticmethod
+    def _mean_task_seconds() -> float:
+        mean_ms = ocr_metrics.mean("total")
+        return mean_ms / 1000 if mean_ms else DEFAULT_TASK_SECONDS
+
+    def _retry_after(self, tasks_ahead: int) -> int:
+        """Seconds until ``tasks_ahead`` tasks have drained across the workers."""
+        slots = max(1, celery_app.conf.worker_concurrency or 1)
+        seconds = math.ceil(tasks_ahead * self._mean_task_seconds() / slots)
+        return min(MAX_RETRY_AFTER_SECONDS, max(1, seconds))
+
+    def reserve(self, owner: str, task_ids: list[str]) -> None:
+        """
+        Record ``task_ids`` as in flight for ``owner``, or raise
+        AdmissionDenied if they won't fit. Call before queueing them, and
+        ``release`` any that end up not being queued. A batch larger than
+        the per-user limit is admitted once the owner has nothing else in
+        flight.
+        """
+        if not task_ids:
+            return
+        now = time.time()
+        verdict, current, excess = self._reserve(
+            keys=[self.INFLIGHT_KEY, self._owner_key(owner), self.OWNERS_KEY],
+            args=[
+                now,
+                now - STALE_AFTER_SECONDS,
+                settings.OCR_MAX_INFLIGHT_TASKS,
+                settings.OCR_MAX_TASKS_PER_USER,
+                self.queue_depth(),
+                owner,
+                STALE_AFTER_SECONDS,
+                *task_ids,
+            ],
+        )
+        if verdict == 1:
+            raise AdmissionDenied(
+                f"You already have {current} receipts processing. "
+                "Please wait for them to finish.",
+                self._retry_after(excess),
+            )
+        if verdict == 2:
+            raise AdmissionDenied(
+                "OCR is busy right now. Please try again shortly.",
+                self._retry_after(excess),
+            )
+
+    def release(self, *task_ids: str) -> None:
+        """Stop counting tasks that finished or were never queued."""
+        if not task_ids:
+            return
+        owners = self.client.hmget(self.OWNERS_KEY, task_ids)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zrem(self.INFLIGHT_KEY, *task_ids)
+        pipe.hdel(self.OWNERS_KEY, *task_ids)
+        for task_id, owner in zip(task_ids, owners):
+            if owner is not None:
+                pipe.zrem(self._owner_key(owner), task_id)
+        pipe.execute()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.client.zcard(self.INFLIGHT_KEY),
+            "queued": self.queue_depth(),
+            "priority_queued": self.queue_depth(settings.OCR_PRIORITY_QUEUE),
+            "max_in_flight": settings.OCR_MAX_INFLIGHT_TASKS,
+            "max_per_user": settings.OCR_MAX_TASKS_PER_USER,
+        }
+
+
+ocr_admission = OCRAdmission()
+
+
+@task_postrun.connect
+def _release_finished_task(sender=None, task_id=None, state=None, **kwargs) -> None:
+    # A retried task is still in flight
+    if sender is None or sender.name not in ADMITTED_TASK_NAMES or state == "RETRY":
+        return
+    try:
+        ocr_admission.release(task_id)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to release OCR admission for {task_id}: {e}")
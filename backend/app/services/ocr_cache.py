@@ -0,0 +1,125 @@
+"""
+Content-addressed cache of parsed OCR results.
+
+Results are stored in Redis under the SHA-256 of the uploaded image bytes,
+so a re-uploaded receipt is answered without queueing another OCR task.
+A sorted set of last-access times keeps the cache bounded: once it grows
+past ``OCR_CACHE_MAX_ENTRIES`` the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class OCRResultCache:
+    """Redis-backed LRU cache of OCR results keyed by image hash."""
+
+    KEY_PREFIX = "ocr_cache"
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        ttl_seconds: int = settings.OCR_CACHE_TTL_SECONDS,
+        max_entries: int = settings.OCR_CACHE_MAX_ENTRIES,
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.KEY_PREFIX}:lru"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.KEY_PREFIX}:stats"
+
+    def _entry_key(self, image_hash: str) -> str:
+        return f"{self.KEY_PREFIX}:result:{image_hash}"
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, image_hash: str) -> Optional[dict]:
+        """Return the cached OCR data for an image hash, or None on a miss."""
+        try:
+            raw = self.client.get(self._entry_key(image_hash))
+            pipe = self.client.pipeline(transaction=False)
+            if raw is None:
+                pipe.hincrby(self._stats_key, "misses", 1)
+            else:
+                pipe.hincrby(self._stats_key, "hits", 1)
+                pipe.zadd(self._index_key, {image_hash: time.time()})
+                pipe.expire(self._entry_key(image_hash), self.ttl_seconds)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"OCR cache lookup failed for {image_hash}: {e}")
+            return None
+
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, image_hash: str, data: dict) -> None:
+        """Store OCR data and evict the least recently used entries."""
+        now = time.time()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(self._entry_key(image_hash), self.ttl_seconds, json.dumps(data))
+            pipe.zadd(self._index_key, {image_hash: now})
+            # Drop index entries whose results have already expired
+            pipe.zremrangebyscore(self._index_key, 0, now - self.ttl_seconds)
+            pipe.zcard(self._index_key)
+            size = pipe.execute()[-1]
+
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = self.client.zpopmin(self._index_key, overflow)
+                self.client.delete(*(self._entry_key(h) for h, _ in evicted))
+        except redis.RedisError as e:
+            logger.warning(f"OCR cache store failed for {image_hash}: {e}")
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss counters and the current number of entries; the
+        Redis-backed figures are None while Redis is unreachable.
+        """
+        report = {
+            "hits": None,
+            "misses": None,
+            "hit_rate": None,
+            "entries": None,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hgetall(self._stats_key)
+            pipe.zcard(self._index_key)
+            counters, entries = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"OCR cache stats unavailable: {e}")
+            return report
+
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+        report.update(
+            hits=hits,
+            misses=misses,
+            hit_rate=hits / lookups if lookups else 0.0,
+            entries=entries,
+        )
+        return report
+
+
+ocr_result_cache = OCRResultCache()
@@ -0,0 +1,198 @@
+"""
+OCR engine backends behind OCRService.
+
+``pytesseract`` forks the tesseract binary and reloads its traineddata on
+every call. ``tesserocr`` keeps one tesseract API handle alive for the life
+of the process, which removes that fixed startup cost from every receipt.
+Each Celery worker process creates its engine once at ``worker_process_init``
+and reuses it across tasks.
+
+tesserocr is opt-in and not part of the default install: it compiles
+against libtesseract, so worker images only include it when built with
+``--build-arg INSTALL_TESSEROCR=true``. ``OCR_ENGINE=auto`` falls back to
+pytesseract with a warning when it is missing; ``OCR_ENGINE=tesserocr``
+refuses to start the worker instead.
+"""
+
+import importlib.util
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import cv2
+import numpy as np
+import pytesseract
+from pytesseract import Output  # type: ignore
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# tessedit_ocr_engine_mode 3: legacy + LSTM, whichever is available
+DEFAULT_OEM = 3
+# Page segmentation mode 6: a single uniform block of text
+DEFAULT_PSM = 6
+
+
+def _as_gray(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+class OCREngine(ABC):
+    name: str
+
+    @abstractmethod
+    def image_to_data(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> dict:
+        """Word boxes in pytesseract's ``Output.DICT`` layout."""
+
+    @abstractmethod
+    def image_to_string(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> str: ...
+
+    def close(self) -> None:
+        pass
+
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract binary as a subprocess for every call."""
+
+    name = "pytesseract"
+
+    @staticmethod
+    def _config(psm: int, whitelist: str) -> str:
+        config = f"--oem {DEFAULT_OEM} --psm {psm}"
+        if whitelist:
+            config += f" -c tessedit_char_whitelist={whitelist}"
+        return config
+
+    def image_to_data(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> dict:
+        return pytesseract.image_to_data(
+            image, config=self._config(psm, whitelist), output_type=Output.DICT
+        )
+
+    def image_to_string(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> str:
+        return pytesseract.image_to_string(image, config=self._config(psm, whitelist))
+
+
+class TesserocrEngine(OCREngine):
+    """Keeps a single tesseract API handle loaded for the whole process."""
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._api = tesserocr.PyTessBaseAPI(psm=DEFAULT_PSM, oem=DEFAULT_OEM)
+        # The handle holds per-image state, so calls must not interleave
+        self._lock = threading.Lock()
+
+    def _set_image(self, image: np.ndarray, psm: int, whitelist: str) -> None:
+        gray = _as_gray(image)
+        height, width = gray.shape
+        self._api.SetPageSegMode(psm)
+        self._api.SetVariable("tessedit_char_whitelist", whitelist)
+        self._api.SetImageBytes(gray.tobytes(), width, height, 1, width)
+
+    def image_to_data(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> dict:
+        level = self._tesserocr.RIL.WORD
+        data: dict[str, list] = {
+            "text": [],
+            "left": [],
+            "top": [],
+            "width": [],
+            "height": [],
+            "conf": [],
+        }
+        with self._lock:
+            self._set_image(image, psm, whitelist)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            for word in self._tesserocr.iterate_level(iterator, level):
+                box = word.BoundingBox(level)
+                if box is None:
+                    continue
+                x0, y0, x1, y1 = box
+                data["text"].append(word.GetUTF8Text(level) or "")
+                data["left"].append(x0)
+                data["top"].append(y0)
+                data["width"].append(x1 - x0)
+                data["height"].append(y1 - y0)
+                data["conf"].append(word.Confidence(level))
+        return data
+
+    def image_to_string(
+        self, image: np.ndarray, psm: int = DEFAULT_PSM, whitelist: str = ""
+    ) -> str:
+        with self._lock:
+            self._set_image(image, psm, whitelist)
+            return self._api.GetUTF8Text()
+
+    def close(self) -> None:
+        self._api.End()
+
+
+_TESSEROCR_MISSING = (
+    "OCR_ENGINE is 'tesserocr' but the tesserocr package is not installed; "
+    "build the worker image with INSTALL_TESSEROCR=true or set OCR_ENGINE=auto"
+)
+
+_ENGINES: dict[str, type[OCREngine]] = {
+    PytesseractEngine.name: PytesseractEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+_engine: Optional[OCREngine] = None
+
+
+def create_ocr_engine(name: str = settings.OCR_ENGINE) -> OCREngine:
+    """Build an engine by name; ``auto`` prefers tesserocr when installed."""
+    if name == "auto":
+        try:
+            return TesserocrEngine()
+        except ImportError:
+            logger.warning("tesserocr is not installed; using pytesseract")
+            return PytesseractEngine()
+    if name not in _ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+    try:
+        return _ENGINES[name]()
+    except ImportError as e:
+        raise RuntimeError(_TESSEROCR_MISSING) from e
+
+
+def require_ocr_engine(name: str = settings.OCR_ENGINE) -> None:
+    """Raise at worker start-up if the configured engine cannot be loaded."""
+    if name == TesserocrEngine.name and importlib.util.find_spec("tesserocr") is None:
+        raise RuntimeError(_TESSEROCR_MISSING)
+
+
+def init_ocr_engine() -> OCREngine:
+    """Create this process's engine; called once per worker process."""
+    global _engine
+    if _engine is None:
+        _engine = create_ocr_engine()
+        logger.info(f"OCR engine initialized: {_engine.name}")
+    return _engine
+
+
+def get_ocr_engine() -> OCREngine:
+    return _engine or init_ocr_engine()
+
+
+def shutdown_ocr_engine() -> None:
+    global _engine
+    if _engine is not None:
+        _engine.close()
+        _engine = None
@@ -0,0 +1,113 @@
+"""
+Push notifications for OCR task state changes.
+
+Workers publish every transition of ``perform_ocr_task`` to a per-task Redis
+pub/sub channel using the same payload shape as ``/task-status``. The web
+app relays those messages to the browser over SSE or a WebSocket, so the
+frontend no longer has to poll.
+"""
+
+import json
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+import redis
+from celery.signals import task_failure, task_prerun, task_retry, task_success
+
+from app.core.redis_client import async_pubsub_client, redis_client
+
+logger = logging.getLogger(__name__)
+
+OCR_TASK_NAME = "perform_ocr_task"
+TERMINAL_STATUSES = {"completed", "failed"}
+# Keep-alive interval while waiting for the next event, in seconds
+KEEPALIVE_SECONDS = 15
+
+
+def task_event_channel(task_id: str) -> str:
+    return f"ocr_task_events:{task_id}"
+
+
+def publish_task_event(task_id: str, payload: dict) -> None:
+    try:
+        redis_client.publish(task_event_channel(task_id), json.dumps(payload))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish OCR event for {task_id}: {e}")
+
+
+@task_prerun.connect
+def _on_task_started(sender=None, task_id=None, **kwargs) -> None:
+    if sender is not None and sender.name == OCR_TASK_NAME:
+        publish_task_event(
+            task_id,
+            {
+                "task_id": task_id,
+                "status": "in_progress",
+                "message": "Task is currently being processed.",
+            },
+        )
+
+
+@task_retry.connect
+def _on_task_retry(sender=None, request=None, reason=None, **kwargs) -> None:
+    if sender is not None and sender.name == OCR_TASK_NAME:
+        publish_task_event(
+            request.id,
+            {"task_id": request.id, "status": "retry", "message": str(reason)},
+        )
+
+
+@task_success.connect
+def _on_task_success(sender=None, result=None, **kwargs) -> None:
+    if sender is not None and sender.name == OCR_TASK_NAME:
+        task_id = sender.request.id
+        publish_task_event(
+            task_id, {"task_id": task_id, "status": "completed", "result": result}
+        )
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, task_id=None, exception=None, **kwargs) -> None:
+    if sender is not None and sender.name == OCR_TASK_NAME:
+        publish_task_event(
+            task_id, {"task_id": task_id, "status": "failed", "message": str(exception)}
+        )
+
+
+async def stream_task_events(
+    task_id: str,
+    current_status: Callable[[str], Awaitable[dict]],
+    timeout: float = 600,
+) -> AsyncIterator[dict | None]:
+    """
+    Yield status payloads for a task until it completes or fails.
+
+    The channel is subscribed before the current state is read, so a
+    transition that happens in between is never lost. ``None`` is yielded
+    as a keep-alive while waiting.
+    """
+    pubsub = async_pubsub_client.pubsub()
+    await pubsub.subscribe(task_event_channel(task_id))
+    try:
+        payload = await current_status(task_id)
+        yield payload
+        if payload["status"] in TERMINAL_STATUSES:
+            return
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=KEEPALIVE_SECONDS
+            )
+            if message is None:
+                yield None
+                continue
+
+            payload = json.loads(message["data"])
+            yield payload
+            if payload["status"] in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.unsubscribe(task_event_channel(task_id))
+        await pubsub.aclose()
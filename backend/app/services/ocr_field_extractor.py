@@ -0,0 +1,187 @@
+"""
+Extraction of receipt fields from OCR text.
+
+All label patterns live in one registry. The patterns for each field are
+compiled into one alternation of lookaheads, so every position where a
+field's label matches is a candidate, even when the text overlaps a match
+for another field ("Transaction ID: NPR500" yields both a reference and an
+amount). Candidates are converted as they are found and the first one
+that converts wins, so an unparseable value does not hide a good one in a
+later row. Each registered pattern must contain exactly one capturing
+group holding the field value.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from app.utils.datetime_to_utc import parse_datetime_to_utc
+
+# Rows are joined with a character that neither ``\s`` nor the value classes
+# match, so a pattern can never span two rows.
+ROW_SEPARATOR = "\x00"
+
+Converter = Callable[[str], Any]
+
+
+@dataclass(frozen=True)
+class FieldPattern:
+    """A registered label pattern for one field."""
+
+    field: str
+    pattern: str
+    # Higher priority wins when two patterns for the same field hit one row
+    priority: int = 0
+
+
+@dataclass
+class ExtractionResult:
+    """
+    Raw field values plus the row index each one came from and the value's
+    ``(start, end)`` character span within that row.
+    """
+
+    values: dict[str, str] = field(default_factory=dict)
+    rows: dict[str, int] = field(default_factory=dict)
+    spans: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+
+class FieldExtractor:
+    """
+    Registry of field patterns and the converters that validate their values.
+
+    The first row that yields a convertible value for a field wins; within
+    the same row a higher-priority pattern replaces a lower-priority one.
+    Fields without a converter keep any non-empty match.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[FieldPattern] = (),
+        converters: Mapping[str, Converter] = {},
+    ):
+        self._patterns: list[FieldPattern] = []
+        self._converters = dict(converters)
+        self._compiled: Optional[dict[str, tuple[re.Pattern, list[int]]]] = None
+        for p in patterns:
+            self.register(p.field, p.pattern, p.priority)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return tuple(dict.fromkeys(p.field for p in self._patterns))
+
+    def register(self, field_name: str, pattern: str, priority: int = 0) -> None:
+        """Add a label pattern; the field's alternation is rebuilt on next use."""
+        if re.compile(pattern).groups != 1:
+            raise ValueError(
+                f"Pattern for '{field_name}' must have exactly one capturing group"
+            )
+        self._patterns.append(FieldPattern(field_name, pattern, priority))
+        self._compiled = None
+
+    def convert(self, field_name: str, value: Optional[str]) -> Any:
+        """The parsed value of a raw match, or None if it does not parse."""
+        if not value:
+            return None
+        converter = self._converters.get(field_name)
+        if converter is None:
+            return value
+        try:
+            return converter(value) or None
+        except ValueError:
+            return None
+
+    def _compile(self) -> dict[str, tuple[re.Pattern, list[int]]]:
+        """Per field: the lookahead alternation and each alternative's priority."""
+        if self._compiled is None:
+            compiled = {}
+            for name in self.fields:
+                # Higher priority first: it wins when two patterns match at
+                # the same position
+                patterns = sorted(
+                    (p for p in self._patterns if p.field == name),
+                    key=lambda p: -p.priority,
+                )
+                alternatives = "|".join(f"(?:{p.pattern})" for p in patterns)
+                compiled[name] = (
+                    re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE),
+                    [p.priority for p in patterns],
+                )
+            self._compiled = compiled
+        return self._compiled
+
+    def extract(self, rows: list[str]) -> ExtractionResult:
+        """Collect the first convertible value per field from normalized rows."""
+        document = ROW_SEPARATOR.join(r.replace("|", " ") for r in rows)
+
+        row_starts = [0]
+        for r in rows[:-1]:
+            row_starts.append(row_starts[-1] + len(r) + len(ROW_SEPARATOR))
+
+        result = ExtractionResult()
+        for name, (regex, priorities) in self._compile().items():
+            found_row: Optional[int] = None
+            found_priority = 0
+            for match in regex.finditer(document):
+                row = bisect_right(row_starts, match.start()) - 1
+                # No later row can replace the value found in an earlier one
+                if found_row is not None and row > found_row:
+                    break
+
+                group = next(i for i, g in enumerate(match.groups()) if g is not None)
+                priority = priorities[group]
+                if found_row is not None and found_priority >= priority:
+                    continue
+                value = match.group(group + 1)
+                if self.convert(name, value) is None:
+                    continue
+
+                start, end = match.span(group + 1)
+                result.values[name] = value
+                result.rows[name] = row
+                result.spans[name] = (start - row_starts[row], end - row_starts[row])
+                found_row, found_priority = row, priority
+
+        return result
+
+
+def _to_float(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+DEFAULT_PATTERNS = (
+    FieldPattern(
+        "reference",
+        r"(?:Reference Code|Transaction Number|Transaction ID|TXN ID)\s*[:\-]?\s*([A-Za-z0-9\-_/]+)",
+    ),
+    FieldPattern(
+        "amount",
+        r"(?:Transaction Amount|Txn Amount|Total Amount|Amount|NPR)\s*(?:\([A-Z]{3}\))?\s*([\d,]+(?:\.\d{2})?)",
+    ),
+    FieldPattern(
+        "charge",
+        r"(?:Charge|Change)\s*(?:\([A-Z]{3}\))?\s*([\d,]+(?:\.\d{2})?)",
+    ),
+    FieldPattern(
+        "date",
+        r"(?:Payment Time|Date\s*/?\s*Time|Transaction Date)\s*[:\-]?\s*([0-9]{1,2}[-\s][A-Za-z]{3}[-\s][0-9]{4},?\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)?)",
+        priority=1,
+    ),
+    FieldPattern(
+        "date",
+        r"\b([0-9]{1,2}[-/\.\s]?[A-Za-z]{3}[-/\.\s]?[0-9]{4},?\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)?)\b",
+    ),
+)
+
+# Shared extractor used by OCRService; register new bank labels here
+default_extractor = FieldExtractor(
+    DEFAULT_PATTERNS,
+    converters={
+        "amount": _to_float,
+        "charge": _to_float,
+        "date": parse_datetime_to_utc,
+    },
+)
@@ -0,0 +1,175 @@
+"""
+Stage-level latency metrics for the OCR pipeline.
+
+Code on the OCR path wraps each step in ``stage("name")``. When a task has
+opened ``collect_stage_timings()`` the step's wall time is added to that
+task's timings; otherwise ``stage`` does nothing, so OCRService stays usable
+outside a task. Finished tasks push their timings and image size into
+fixed-bucket histograms in Redis (one pipelined round trip per task), from
+which ``summary()`` reports count, mean and p50/p95/p99 per stage.
+
+Histograms are kept per minute and expire once they leave the reporting
+window (``OCR_METRICS_WINDOW_MINUTES``); readers sum the minutes still in
+the window, so figures track current latency instead of all history.
+"""
+
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Histogram upper bounds: 1-2-3-5-7 steps per decade, 0.1 to 70000
+BUCKET_BOUNDS = tuple(
+    round(m * 10.0**e, 1) for e in range(-1, 5) for m in (1, 2, 3, 5, 7)
+)
+PERCENTILES = (50, 95, 99)
+
+_active_timings: ContextVar[Optional[dict[str, float]]] = ContextVar(
+    "ocr_stage_timings", default=None
+)
+
+
+@contextmanager
+def collect_stage_timings() -> Iterator[dict[str, float]]:
+    """Collect the milliseconds spent in each ``stage`` within the block."""
+    timings: dict[str, float] = {}
+    token = _active_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _active_timings.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    timings = _active_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+class OCRMetrics:
+    """Redis histograms, one hash per metric per minute."""
+
+    KEY_PREFIX = "ocr_metrics"
+    NAMES_KEY = "ocr_metrics:names"
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        window_minutes: int = settings.OCR_METRICS_WINDOW_MINUTES,
+    ):
+        self.client = client
+        self.window_minutes = window_minutes
+
+    def _key(self, name: str, minute: int) -> str:
+        return f"{self.KEY_PREFIX}:{name}:{minute}"
+
+    def _window(self) -> range:
+        """Minutes since the epoch covered by the reporting window."""
+        now = int(time.time() // 60)
+        return range(now - self.window_minutes + 1, now + 1)
+
+    @staticmethod
+    def _bucket(value: float) -> str:
+        index = bisect.bisect_left(BUCKET_BOUNDS, value)
+        return str(BUCKET_BOUNDS[index]) if index < len(BUCKET_BOUNDS) else "inf"
+
+    def record(self, values: dict[str, float]) -> None:
+        """Add one observation per metric, e.g. stage timings in ms."""
+        if not values:
+            return
+        minute = int(time.time() // 60)
+        # Kept one minute past the window so a reader never sees it vanish
+        ttl = (self.window_minutes + 1) * 60
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.sadd(self.NAMES_KEY, *values)
+            for name, value in values.items():
+                key = self._key(name, minute)
+                pipe.hincrby(key, self._bucket(value), 1)
+                pipe.hincrby(key, "count", 1)
+                pipe.hincrbyfloat(key, "sum", value)
+                pipe.expire(key, ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to record OCR metrics: {e}")
+
+    def _windowed(self, names: list[str]) -> list[dict[str, float]]:
+        """For each metric, its histogram fields summed over the window."""
+        minutes = self._window()
+        pipe = self.client.pipeline(transaction=False)
+        for name in names:
+            for minute in minutes:
+                pipe.hgetall(self._key(name, minute))
+        hashes = pipe.execute()
+
+        merged = []
+        for i in range(len(names)):
+            totals: dict[str, float] = {}
+            for fields in hashes[i * len(minutes) : (i + 1) * len(minutes)]:
+                for field, value in fields.items():
+                    totals[field] = totals.get(field, 0.0) + float(value)
+            merged.append(totals)
+        return merged
+
+    def mean(self, name: str) -> Optional[float]:
+        """Mean of a metric over the window, or None if nothing was recorded."""
+        totals = self._windowed([name])[0]
+        count = totals.get("count", 0)
+        return totals["sum"] / count if count else None
+
+    @staticmethod
+    def _percentile(buckets: list[tuple[float, int]], count: int, q: int) -> float:
+        """Upper bound of the bucket holding the q-th percentile."""
+        target = count * q / 100
+        seen = 0
+        for bound, n in buckets:
+            seen += n
+            if seen >= target:
+                return bound
+        return buckets[-1][0]
+
+    def summary(self) -> dict:
+        """Count, mean and percentiles over the window for every metric."""
+        names = sorted(self.client.smembers(self.NAMES_KEY))
+
+        report = {}
+        for name, totals in zip(names, self._windowed(names)):
+            count = int(totals.pop("count", 0))
+            if not count:
+                continue
+            total = totals.pop("sum", 0.0)
+            buckets = sorted((float(bound), int(n)) for bound, n in totals.items())
+            report[name] = {
+                "count": count,
+                "mean": round(total / count, 2),
+                **{
+                    f"p{q}": self._percentile(buckets, count, q)
+                    for q in PERCENTILES
+                },
+            }
+        return report
+
+    def reset(self) -> None:
+        names = self.client.smembers(self.NAMES_KEY)
+        keys = [self._key(n, m) for n in names for m in self._window()]
+        self.client.delete(self.NAMES_KEY, *keys)
+
+
+ocr_metrics = OCRMetrics()
@@ -1,17 +1,52 @@
-from pytesseract import Output   # type: ignore
-import pytesseract
+from typing import Iterator, NamedTuple, Optional
+import numpy as np
 import cv2
-import re
 import logging
+import re
+import time
 
-from app.utils.datetime_to_utc import parse_datetime_to_utc         
+from celery.exceptions import SoftTimeLimitExceeded
+
+from app.core.config import settings
+from app.services.image_quality import ImageQualityError
+from app.services.ocr_engine import get_ocr_engine
+from app.services.ocr_metrics import stage
+from app.services.ocr_preprocess import preprocess as preprocess_image
+from app.services.ocr_field_extractor import ExtractionResult, default_extractor
+from app.services.receipt_templates import template_registry
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def _to_float(value):
-    return float(value.replace(",", "")) if value else None
+# Fields whose second pass reads only the value, restricted to digits
+NUMERIC_FIELDS = {"amount", "charge"}
+NUMERIC_WHITELIST = "0123456789.,"
+_NUMERIC_VALUE = re.compile(r"[\d,]+(?:\.\d{2})?")
+# Page segmentation mode 7: a single text line
+SINGLE_LINE_PSM = 7
+SECOND_PASS_SCALE = 2.0
+SECOND_PASS_PADDING = 4  # pixels around the crop, before upscaling
+
+Box = tuple[int, int, int, int]  # x0, y0, x1, y1
+
+
+class WordArrays(NamedTuple):
+    """Non-empty words from ``image_to_data`` as parallel NumPy arrays."""
+
+    top: np.ndarray
+    left: np.ndarray
+    height: np.ndarray
+    conf: np.ndarray
+    index: np.ndarray  # position of each word in data["text"]
+
+
+class FieldEvidence(NamedTuple):
+    """Where an extracted field was read and how sure tesseract was."""
+
+    confidence: float  # lowest word confidence of the value, 0-100
+    line_box: Box
+    value_box: Box
 
 
 class OCRService:
@@ -23,77 +58,305 @@ class OCRService:
         return text
 
     @staticmethod
-    def extract_match(pattern: str, text: str):
-        match = re.search(pattern, text, re.IGNORECASE)
-        return match.group(1) if match else None
+    def load_word_arrays(data: dict) -> WordArrays:
+        """Load the non-empty words of an ``image_to_data`` dict into arrays."""
+        texts = data["text"]
+        index = np.fromiter(
+            (i for i, txt in enumerate(texts) if txt and txt.strip()), dtype=np.intp
+        )
+        return WordArrays(
+            top=np.asarray(data["top"], dtype=np.int32)[index],
+            left=np.asarray(data["left"], dtype=np.int32)[index],
+            height=np.asarray(data["height"], dtype=np.int32)[index],
+            conf=np.asarray(data["conf"], dtype=np.float32)[index],
+            index=index,
+        )
 
     @staticmethod
-    def extract_transaction_data(text: str) -> dict:
-        text = re.sub(r"[|]", " ", text)
+    def group_words_into_rows(data: dict, row_tolerance: int = 10) -> Iterator[str]:
+        """
+        Yield the text of each visual row, top to bottom.
+
+        Rows are produced lazily so callers can stop as soon as they have
+        what they need.
+        """
+        texts = data["text"]
+        for row in OCRService.group_word_indices_into_rows(data, row_tolerance):
+            yield " ".join(texts[i] for i in row)
+
+    @staticmethod
+    def group_word_indices_into_rows(
+        data: dict, row_tolerance: int = 10
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield the ``data["text"]`` indices of each visual row, top to bottom.
 
-        ref_pattern = r"(?:Reference Code|Transaction Number|Transaction ID|TXN ID)\s*[:\-]?\s*([A-Za-z0-9\-_/]+)"
-        amount_pattern = r"(?:Transaction Amount|Txn Amount|Total Amount|Amount|NPR)\s*(?:\([A-Z]{3}\))?\s*([\d,]+(?:\.\d{2})?)"
-        charge_pattern = r"(?:Charge|Change)\s*(?:\([A-Z]{3}\))?\s*([\d,]+(?:\.\d{2})?)"
+        Words are sorted by their top coordinate and a new row starts wherever
+        the gap to the previous word exceeds ``row_tolerance`` pixels. Words
+        within a row are ordered left to right.
+        """
+        words = OCRService.load_word_arrays(data)
+        if words.index.size == 0:
+            return
 
-        label_based = r"(?:Payment Time|Date\s*/?\s*Time|Transaction Date)\s*[:\-]?\s*([0-9]{1,2}[-\s][A-Za-z]{3}[-\s][0-9]{4},?\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)?)"
-        label_optional = r"\b([0-9]{1,2}[-/\.\s]?[A-Za-z]{3}[-/\.\s]?[0-9]{4},?\s*[0-9]{1,2}:[0-9]{2}\s*(?:AM|PM)?)\b"
+        # Cluster on the sorted top coordinates, then order each row by left
+        order = np.argsort(words.top, kind="stable")
+        row_ids = np.concatenate(
+            ([0], np.cumsum(np.diff(words.top[order]) > row_tolerance))
+        )
+        reading_order = np.lexsort((words.left[order], row_ids))
+        order, row_ids = order[reading_order], row_ids[reading_order]
+        breaks = np.flatnonzero(np.diff(row_ids)) + 1
 
-        amount = OCRService.extract_match(amount_pattern, text)
-        charge = OCRService.extract_match(charge_pattern, text)
-        reference = OCRService.extract_match(ref_pattern, text)
+        yield from np.split(words.index[order], breaks)
 
-        date = OCRService.extract_match(label_based, text)
-        if not date:
-            date = OCRService.extract_match(label_optional, text)
+    @staticmethod
+    def field_evidence(
+        data: dict, row: np.ndarray, span: tuple[int, int]
+    ) -> FieldEvidence:
+        """
+        Map a value's character span in a row back to its words. Relies on
+        the row text being its words joined by single spaces.
+        """
+        lengths = np.fromiter((len(data["text"][i]) for i in row), dtype=np.intp)
+        starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        in_value = (starts < span[1]) & (starts + lengths > span[0])
+        value_words = row[in_value] if in_value.any() else row
+
+        def box(indices: np.ndarray) -> Box:
+            left = np.asarray(data["left"], dtype=np.int32)[indices]
+            top = np.asarray(data["top"], dtype=np.int32)[indices]
+            right = left + np.asarray(data["width"], dtype=np.int32)[indices]
+            bottom = top + np.asarray(data["height"], dtype=np.int32)[indices]
+            return int(left.min()), int(top.min()), int(right.max()), int(bottom.max())
+
+        conf = np.asarray(data["conf"], dtype=np.float32)[value_words]
+        return FieldEvidence(float(conf.min()), box(row), box(value_words))
+
+    @staticmethod
+    def reocr_field(
+        gray_img: np.ndarray, name: str, evidence: FieldEvidence
+    ) -> Optional[tuple[str, float]]:
+        """
+        Second pass over a single low-confidence field: OCR an upscaled crop
+        as one text line. Numeric fields crop just the value and restrict
+        tesseract to digits; other fields re-read the whole labelled line.
+        Returns ``(value, confidence)``, or None if nothing usable was read.
+        """
+        numeric = name in NUMERIC_FIELDS
+        x0, y0, x1, y1 = evidence.value_box if numeric else evidence.line_box
+        height, width = gray_img.shape[:2]
+        region = gray_img[
+            max(0, y0 - SECOND_PASS_PADDING) : min(height, y1 + SECOND_PASS_PADDING),
+            max(0, x0 - SECOND_PASS_PADDING) : min(width, x1 + SECOND_PASS_PADDING),
+        ]
+        if region.size == 0:
+            return None
+        region = cv2.resize(
+            region,
+            None,
+            fx=SECOND_PASS_SCALE,
+            fy=SECOND_PASS_SCALE,
+            interpolation=cv2.INTER_CUBIC,
+        )
+
+        data = get_ocr_engine().image_to_data(
+            region,
+            psm=SINGLE_LINE_PSM,
+            whitelist=NUMERIC_WHITELIST if numeric else "",
+        )
+        words = OCRService.load_word_arrays(data)
+        if words.index.size == 0:
+            return None
+        text = OCRService._normalize_row_text(
+            " ".join(data["text"][i] for i in words.index)
+        )
+
+        if numeric:
+            value = text.replace(" ", "")
+            if not _NUMERIC_VALUE.fullmatch(value):
+                return None
+        else:
+            value = default_extractor.extract([text]).values.get(name)
+            if value is None:
+                return None
+        return value, float(words.conf.min())
 
+    @staticmethod
+    def _convert_fields(values: dict) -> dict:
         return {
-            "amount": _to_float(amount),
-            "charge": _to_float(charge),
-            "date": parse_datetime_to_utc(date),
-            "reference": reference,
+            name: default_extractor.convert(name, values.get(name))
+            for name in ("amount", "charge", "date", "reference")
         }
 
     @staticmethod
-    def perform_ocr_on_image(image_path: str) -> dict:
+    def extract_transaction_fields(rows: list[str]) -> ExtractionResult:
+        """
+        Run the field extractor over normalized rows in a single scan.
+        The result keeps the raw values and the row each one came from.
+        """
+        return default_extractor.extract(rows)
+
+    @staticmethod
+    def extract_transaction_data(text: str) -> dict:
+        result = OCRService.extract_transaction_fields([text])
+        return OCRService._convert_fields(result.values)
+
+    @staticmethod
+    def load_image(image_path: str) -> np.ndarray:
+        image = cv2.imread(image_path)
+        if image is None:
+            logger.error(f"OCR failed for {image_path}: Image could not be read")
+            raise RuntimeError("OCR processing failed")
+        return image
+
+    @staticmethod
+    def decode_image(data: bytes) -> np.ndarray:
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            logger.error("OCR failed: image bytes could not be decoded")
+            raise ImageQualityError("Image could not be decoded.")
+        return image
+
+    @staticmethod
+    def perform_ocr(image: np.ndarray, preprocess: bool | None = None) -> dict:
+        """
+        OCR a decoded BGR image. ``preprocess`` overrides the
+        OCR_PREPROCESS_ENABLED setting, which is how the two paths are compared.
+        Full-page results include a ``confidence`` map per extracted field;
+        fields below OCR_FIELD_MIN_CONFIDENCE are re-read on their own.
+        """
         row_tolerance = 10
-        lines: list = []
-        details = {}
+        if preprocess is None:
+            preprocess = settings.OCR_PREPROCESS_ENABLED
 
         try:
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError("Image could not be read")
+            with stage("grayscale"):
+                gray_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-            gray_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            with stage("template"):
+                template_fields = OCRService._extract_with_template(gray_img)
+            if template_fields is not None:
+                return template_fields
 
-            data = pytesseract.image_to_data(
-                gray_img, config="--oem 3 --psm 6", output_type=Output.DICT
-            )
+            if preprocess:
+                with stage("preprocess"):
+                    prepared = preprocess_image(gray_img)
+                stages = ", ".join(
+                    f"{stage}={seconds * 1000:.1f}ms"
+                    for stage, seconds in prepared.timings.items()
+                )
+                logger.info(
+                    f"OCR preprocessing: {stages}, "
+                    f"skew={prepared.skew_degrees:.2f}, blocks={prepared.text_blocks}"
+                )
+                gray_img = prepared.image
+
+            with stage("tesseract"):
+                data = get_ocr_engine().image_to_data(gray_img)
 
+        except (ValueError, SoftTimeLimitExceeded):
+            # Unusable input, bad configuration or the time limit: the task
+            # must see these as they are, since a retry would fail the same way
+            raise
         except Exception as e:
-            logger.error(f"OCR failed for {image_path}: {e}")
+            logger.error(f"OCR failed: {e}")
             raise RuntimeError("OCR processing failed") from e
 
-        # Group words into rows
-        for i, txt in enumerate(data["text"]):
-            if not txt.strip():
-                continue
-            y = data["top"][i]
-            for row in lines:
-                if abs(row["y"] - y) <= row_tolerance:
-                    row["texts"].append(txt)
-                    break
-            else:
-                lines.append({"y": y, "texts": [txt]})
-
-        # Process each row
-        for row in lines:
-            row_text = " ".join(row["texts"])
-            normalized = OCRService._normalize_row_text(row_text)
-
-            extracted = OCRService.extract_transaction_data(normalized)
-            for key, value in extracted.items():
-                if value and key not in details:
-                    details[key] = value
-
-        return details
+        with stage("group_rows"):
+            row_indices = list(
+                OCRService.group_word_indices_into_rows(data, row_tolerance)
+            )
+            rows = [
+                OCRService._normalize_row_text(" ".join(data["text"][i] for i in row))
+                for row in row_indices
+            ]
+        with stage("extract_fields"):
+            result = OCRService.extract_transaction_fields(rows)
+
+        values = dict(result.values)
+        confidence = {}
+        for name, row in result.rows.items():
+            evidence = OCRService.field_evidence(
+                data, row_indices[row], result.spans[name]
+            )
+            confidence[name] = evidence.confidence
+            if (
+                settings.OCR_SECOND_PASS_ENABLED
+                and evidence.confidence < settings.OCR_FIELD_MIN_CONFIDENCE
+            ):
+                with stage("second_pass"):
+                    second = OCRService._second_pass(gray_img, name, evidence)
+                if second is not None and second[1] > evidence.confidence:
+                    values[name], confidence[name] = second
+
+        with stage("parse_fields"):
+            extracted = OCRService._convert_fields(values)
+        fields = {key: value for key, value in extracted.items() if value}
+        fields["confidence"] = {
+            key: round(confidence[key], 1) for key in fields if key in confidence
+        }
+        return fields
+
+    @staticmethod
+    def _second_pass(
+        gray_img: np.ndarray, name: str, evidence: FieldEvidence
+    ) -> Optional[tuple[str, float]]:
+        start = time.perf_counter()
+        try:
+            second = OCRService.reocr_field(gray_img, name, evidence)
+        except Exception as e:
+            logger.warning(f"Second-pass OCR of '{name}' failed: {e}")
+            return None
+        logger.info(
+            f"Second-pass OCR of '{name}' (confidence {evidence.confidence:.0f}): "
+            f"{'no usable value' if second is None else f'confidence {second[1]:.0f}'}"
+            f" in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return second
+
+    @staticmethod
+    def _extract_with_template(gray_img: np.ndarray) -> dict | None:
+        """
+        OCR only the field regions of a known receipt layout. Returns None
+        for unknown layouts or incomplete extractions so the caller falls
+        back to the full page.
+        """
+        if not settings.OCR_TEMPLATES_ENABLED or not len(template_registry):
+            return None
+
+        try:
+            match = template_registry.extract(gray_img)
+        except Exception as e:
+            logger.warning(f"Template OCR failed, using full page: {e}")
+            return None
+
+        if match is None or not match.complete:
+            return None
+        logger.info(f"Receipt matched template '{match.template.name}'")
+        extracted = OCRService._convert_fields(match.values)
+        return {key: value for key, value in extracted.items() if value}
+
+    @staticmethod
+    def compare_preprocessing(image: np.ndarray) -> dict:
+        """
+        Run the original and the preprocessed path on the same image and
+        report the extracted fields and wall time of each.
+        """
+        report = {}
+        for name, enabled in (("original", False), ("preprocessed", True)):
+            start = time.perf_counter()
+            fields = OCRService.perform_ocr(image, preprocess=enabled)
+            report[name] = {"fields": fields, "seconds": time.perf_counter() - start}
+        values = {
+            name: {k: v for k, v in run["fields"].items() if k != "confidence"}
+            for name, run in report.items()
+        }
+        report["fields_match"] = values["original"] == values["preprocessed"]
+        return report
+
+    @staticmethod
+    def perform_ocr_on_image(image_path: str) -> dict:
+        with stage("load_image"):
+            image = OCRService.load_image(image_path)
+        return OCRService.perform_ocr(image)
@@ -0,0 +1,66 @@
+"""
+Non-blocking OCR task status lookups.
+
+Task states are read straight from the Celery Redis result backend with an
+asyncio client, so status endpoints never block the event loop, and any
+number of tasks is resolved with one pipelined ``MGET``.
+"""
+
+from typing import Optional
+
+import redis.asyncio
+
+from app.celery_app import celery_app
+
+_client: Optional[redis.asyncio.Redis] = None
+
+
+def _result_backend_client() -> redis.asyncio.Redis:
+    global _client
+    if _client is None:
+        _client = redis.asyncio.Redis.from_url(celery_app.conf.result_backend)
+    return _client
+
+
+def _status_payload(task_id: str, raw: Optional[bytes]) -> dict:
+    """Map a stored task meta record to the status payload the frontend polls."""
+    if raw is None:
+        return {
+            "task_id": task_id,
+            "status": "pending",
+            "message": "Task is pending execution.",
+        }
+
+    meta = celery_app.backend.decode_result(raw)
+    state = meta["status"]
+    if state == "STARTED":
+        return {
+            "task_id": task_id,
+            "status": "in_progress",
+            "message": "Task is currently being processed.",
+        }
+    elif state == "SUCCESS":
+        return {"task_id": task_id, "status": "completed", "result": meta["result"]}
+    elif state == "FAILURE":
+        return {"task_id": task_id, "status": "failed", "message": str(meta["result"])}
+    else:
+        return {
+            "task_id": task_id,
+            "status": state.lower(),
+            "message": "Task is in an unknown state.",
+        }
+
+
+async def fetch_task_statuses(task_ids: list[str]) -> dict[str, dict]:
+    """Resolve the status of every task id with a single MGET."""
+    if not task_ids:
+        return {}
+    keys = [celery_app.backend.get_key_for_task(task_id) for task_id in task_ids]
+    raws = await _result_backend_client().mget(keys)
+    return {
+        task_id: _status_payload(task_id, raw) for task_id, raw in zip(task_ids, raws)
+    }
+
+
+async def fetch_task_status(task_id: str) -> dict:
+    return (await fetch_task_statuses([task_id]))[task_id]
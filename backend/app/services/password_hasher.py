@@ -0,0 +1,108 @@
+"""
+bcrypt hashing off the event loop.
+
+A bcrypt hash or check takes a few hundred milliseconds of CPU. Called
+from an ``async def`` handler it stalls every request on the worker, so
+handlers await ``password_hasher.hash`` / ``verify`` instead, which run
+bcrypt on a dedicated thread pool (bcrypt releases the GIL while it
+works). The pool size caps how many hashes run at once; callers beyond
+the pool plus ``PASSWORD_HASH_MAX_PENDING`` queued ones are refused with
+503 rather than queueing without bound during a login storm. The time
+each call waits for a free worker is tracked for ``stats()``.
+"""
+
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+from app.utils.cpu_topology import available_cpus
+
+T = TypeVar("T")
+
+# Number of recent queue waits kept for the percentiles in stats()
+WAIT_SAMPLES = 1000
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        workers: Optional[int] = settings.PASSWORD_HASH_WORKERS,
+        max_pending: int = settings.PASSWORD_HASH_MAX_PENDING,
+    ):
+        self.workers = workers or max(1, available_cpus() // 2)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password-hash"
+        )
+        # Submitted and not yet finished; only touched on the event loop
+        self._in_flight = 0
+        self._rejected = 0
+        # Waits are recorded from the pool threads
+        self._waits_lock = threading.Lock()
+        self._waits_ms: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._completed = 0
+
+    def _record_wait(self, wait_ms: float) -> None:
+        with self._waits_lock:
+            self._waits_ms.append(wait_ms)
+            self._completed += 1
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        if self._in_flight >= self.workers + self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins are being processed. Please try again.",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def timed() -> T:
+            self._record_wait((time.perf_counter() - submitted) * 1000)
+            return fn(*args)
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, timed)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        """Pool size, current load and queue wait over recent calls."""
+        with self._waits_lock:
+            waits = sorted(self._waits_ms)
+            completed = self._completed
+        report = {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "completed": completed,
+            "rejected": self._rejected,
+        }
+        if waits:
+            report["wait_ms"] = {
+                "mean": round(statistics.mean(waits), 2),
+                "p50": round(waits[len(waits) // 2], 2),
+                "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2),
+                "max": round(waits[-1], 2),
+            }
+        return report
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,221 @@
+"""
+Two-tier cache of authenticated principals.
+
+Resolving a bearer token to the caller's id, roles and account flags is
+the only thing most authenticated requests need from the user table, so
+the result is cached: first in a small per-process LRU with a short TTL,
+then in a Redis hash per user shared by every API process. Code that
+changes a user's roles, flags, password or existence calls
+``invalidate`` before committing, which clears Redis and this process's
+LRU; other processes drop their copy within
+``PRINCIPAL_CACHE_LOCAL_TTL_SECONDS``. ``invalidate`` also leaves a short
+tombstone that makes ``set`` a no-op, so a request that read the user just
+before the change cannot put the old principal back. If Redis cannot take
+the tombstone the change is refused with 503 rather than leaving a stale
+principal authorized for the cache TTL.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import redis
+import redis.asyncio
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+# Longer than loading a user and storing the principal can take, and than
+# committing the change that invalidated it
+TOMBSTONE_SECONDS = 10
+INVALIDATE_ATTEMPTS = 3
+INVALIDATE_BACKOFF_SECONDS = 0.1
+
+# KEYS: principal hash, tombstone; ARGV: ttl, then field/value pairs
+_STORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def _role_values(roles) -> tuple[str, ...]:
+    # JSON columns hold plain strings; freshly assigned roles are enums
+    return tuple(getattr(r, "value", r) for r in roles or ())
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What request handlers need to know about the authenticated user."""
+
+    id: uuid.UUID
+    email: Optional[str]
+    first_name: str
+    last_name: str
+    access_roles: tuple[str, ...]
+    cooperative_roles: tuple[str, ...]
+    disabled: bool
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            access_roles=_role_values(user.access_roles),
+            cooperative_roles=_role_values(user.cooperative_roles),
+            disabled=user.disabled,
+            is_verified=user.is_verified,
+        )
+
+    def to_hash(self) -> dict[str, str]:
+        return {
+            "email": self.email or "",
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "access_roles": ",".join(self.access_roles),
+            "cooperative_roles": ",".join(self.cooperative_roles),
+            "disabled": "1" if self.disabled else "0",
+            "is_verified": "1" if self.is_verified else "0",
+        }
+
+    @classmethod
+    def from_hash(cls, user_id: uuid.UUID, fields: dict[str, str]) -> "Principal":
+        return cls(
+            id=user_id,
+            email=fields["email"] or None,
+            first_name=fields["first_name"],
+            last_name=fields["last_name"],
+            access_roles=tuple(filter(None, fields["access_roles"].split(","))),
+            cooperative_roles=tuple(
+                filter(None, fields["cooperative_roles"].split(","))
+            ),
+            disabled=fields["disabled"] == "1",
+            is_verified=fields["is_verified"] == "1",
+        )
+
+
+class PrincipalCache:
+    KEY_PREFIX = "principal"
+
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = async_redis_client,
+        local_ttl_seconds: float = settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+        local_max_entries: int = settings.PRINCIPAL_CACHE_LOCAL_MAX_ENTRIES,
+        ttl_seconds: int = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    ):
+        self.client = client
+        self.local_ttl_seconds = local_ttl_seconds
+        self.local_max_entries = local_max_entries
+        self.ttl_seconds = ttl_seconds
+        # user id -> (expires at, principal), least recently used first
+        self._local: OrderedDict[uuid.UUID, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = client.register_script(_STORE_SCRIPT)
+
+    def _key(self, user_id: uuid.UUID) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}"
+
+    def _tombstone_key(self, user_id: uuid.UUID) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}:invalidated"
+
+    def _get_local(self, user_id: uuid.UUID) -> Optional[Principal]:
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._local[user_id]
+                return None
+            self._local.move_to_end(user_id)
+            return principal
+
+    def _set_local(self, principal: Principal) -> None:
+        with self._lock:
+            self._local[principal.id] = (
+                time.monotonic() + self.local_ttl_seconds,
+                principal,
+            )
+            self._local.move_to_end(principal.id)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    async def get(self, user_id: uuid.UUID) -> Optional[Principal]:
+        """The cached principal for ``user_id``, or None on a miss."""
+        principal = self._get_local(user_id)
+        if principal is not None:
+            return principal
+        try:
+            fields = await self.client.hgetall(self._key(user_id))
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache lookup failed for {user_id}: {e}")
+            return None
+        if not fields:
+            return None
+        principal = Principal.from_hash(user_id, fields)
+        self._set_local(principal)
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        """Cache a principal just loaded from the user table."""
+        fields = [v for pair in principal.to_hash().items() for v in pair]
+        try:
+            stored = await self._store(
+                keys=[self._key(principal.id), self._tombstone_key(principal.id)],
+                args=[self.ttl_seconds, *fields],
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache store failed for {principal.id}: {e}")
+            return
+        if stored:
+            self._set_local(principal)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        """
+        Forget a user whose roles, flags or password are about to change.
+        Call before committing the change: if the tombstone cannot be
+        written after a few attempts this raises 503, and the change must
+        not go ahead, since every process would keep authorizing the old
+        principal until its TTL ran out.
+        """
+        with self._lock:
+            self._local.pop(user_id, None)
+        for attempt in range(1, INVALIDATE_ATTEMPTS + 1):
+            try:
+                async with self.client.pipeline(transaction=True) as pipe:
+                    pipe.delete(self._key(user_id))
+                    pipe.setex(self._tombstone_key(user_id), TOMBSTONE_SECONDS, 1)
+                    await pipe.execute()
+                return
+            except redis.RedisError as e:
+                logger.warning(
+                    f"Principal cache invalidation failed for {user_id} "
+                    f"(attempt {attempt}/{INVALIDATE_ATTEMPTS}): {e}"
+                )
+            if attempt < INVALIDATE_ATTEMPTS:
+                await asyncio.sleep(INVALIDATE_BACKOFF_SECONDS * attempt)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account changes are unavailable right now. Please try again.",
+            headers={"Retry-After": "5"},
+        )
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,160 @@
+"""
+Near-duplicate receipt detection with perceptual hashes.
+
+Each processed receipt gets a 64-bit difference hash (dHash) that survives
+re-encoding, rescaling and light cropping. Hashes are stored in Redis as a
+multi-index Hamming lookup: the hash is split into eight 8-bit bands and
+each band value points at the hashes that contain it. Two hashes within
+Hamming distance 7 must share at least one band, so a lookup only compares
+against the union of eight small buckets instead of every stored receipt.
+
+Receipts printed from the same layout hash close together even when they
+record different transactions, so a near match alone proves nothing. A
+stored receipt only counts as a duplicate when its parse also agrees on
+the fields that identify a transaction; the match is reported as a flag
+and its data is never handed back in place of the new receipt's own OCR.
+An exact re-upload never reaches the index: it is answered from the OCR
+result cache, which flags it as a duplicate of its own image hash.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+BAND_BITS = 8
+BAND_COUNT = HASH_BITS // BAND_BITS
+# Parsed fields two receipts must share to be the same transaction
+TRANSACTION_FIELDS = ("amount", "date", "reference")
+
+
+def dhash(image: np.ndarray) -> int:
+    """Compute the 64-bit difference hash of a BGR or grayscale image."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def same_transaction(a: dict, b: dict) -> bool:
+    """Whether two OCR parses read an amount and agree on every identifying field."""
+    return a.get("amount") is not None and all(
+        a.get(name) == b.get(name) for name in TRANSACTION_FIELDS
+    )
+
+
+def flag_duplicate(data: dict, duplicate_of: Optional[str]) -> dict:
+    """OCR data marked as a possible duplicate of the receipt ``duplicate_of``."""
+    return {**data, "possible_duplicate": True, "duplicate_of": duplicate_of}
+
+
+@dataclass
+class DuplicateMatch:
+    """A previously processed receipt that looks like the incoming one."""
+
+    phash: int
+    distance: int
+    image_hash: Optional[str]
+    data: dict
+
+
+class ReceiptHashIndex:
+    """Redis-backed multi-index Hamming lookup of receipt hashes."""
+
+    KEY_PREFIX = "ocr_phash"
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        max_distance: int = settings.OCR_DUPLICATE_MAX_DISTANCE,
+        ttl_seconds: int = settings.OCR_DUPLICATE_TTL_SECONDS,
+    ):
+        if max_distance >= BAND_COUNT:
+            raise ValueError(
+                f"max_distance must be below {BAND_COUNT} for exact band lookup"
+            )
+        self.client = client
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _bands(phash: int) -> list[int]:
+        mask = (1 << BAND_BITS) - 1
+        return [(phash >> (i * BAND_BITS)) & mask for i in range(BAND_COUNT)]
+
+    def _band_key(self, band: int, value: int) -> str:
+        return f"{self.KEY_PREFIX}:band:{band}:{value:02x}"
+
+    def _entry_key(self, phash: int) -> str:
+        return f"{self.KEY_PREFIX}:entry:{phash:016x}"
+
+    def find(self, phash: int, data: dict) -> Optional[DuplicateMatch]:
+        """
+        Return the closest stored receipt within ``max_distance`` whose parse
+        is the same transaction as ``data``, if any.
+        """
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for band, value in enumerate(self._bands(phash)):
+                pipe.smembers(self._band_key(band, value))
+            candidates = set().union(*pipe.execute())
+
+            ranked = sorted(
+                (hamming_distance(phash, c), c)
+                for c in (int(member, 16) for member in candidates)
+            )
+            for distance, candidate in ranked:
+                if distance > self.max_distance:
+                    break
+                raw = self.client.get(self._entry_key(candidate))
+                if raw is None:
+                    # The entry expired; its band memberships are stale
+                    continue
+                entry = json.loads(raw)
+                if not same_transaction(data, entry["data"]):
+                    continue
+                return DuplicateMatch(
+                    phash=candidate,
+                    distance=distance,
+                    image_hash=entry.get("image_hash"),
+                    data=entry["data"],
+                )
+        except redis.RedisError as e:
+            logger.warning(f"Receipt hash lookup failed for {phash:016x}: {e}")
+        return None
+
+    def add(self, phash: int, image_hash: Optional[str], data: dict) -> None:
+        """Store a processed receipt under its perceptual hash."""
+        member = f"{phash:016x}"
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(
+                self._entry_key(phash),
+                self.ttl_seconds,
+                json.dumps({"image_hash": image_hash, "data": data}),
+            )
+            for band, value in enumerate(self._bands(phash)):
+                key = self._band_key(band, value)
+                pipe.sadd(key, member)
+                pipe.expire(key, self.ttl_seconds)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Receipt hash store failed for {member}: {e}")
+
+
+receipt_hash_index = ReceiptHashIndex()
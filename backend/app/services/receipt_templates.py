@@ -0,0 +1,197 @@
+"""
+Fixed-layout receipt templates.
+
+Most receipts come from a handful of wallets and banks whose layouts never
+change. A template records the page aspect ratio, how to recognise the
+header (a dHash of the logo area or keywords in the header text) and where
+each field sits on the page. A matching receipt is OCR'd on those small
+crops only; anything else falls back to the full-page path in OCRService.
+
+Templates are loaded from the JSON file in ``OCR_TEMPLATE_FILE``, a list of
+objects such as::
+
+    {
+        "name": "esewa",
+        "aspect_ratio": 2.1,
+        "header_region": [0.0, 0.05, 1.0, 0.15],
+        "header_keywords": ["eSewa"],
+        "fields": {
+            "amount": [0.0, 0.30, 1.0, 0.36],
+            "reference": [0.0, 0.52, 1.0, 0.58]
+        }
+    }
+
+Regions are fractions of the page width and height: ``[x0, y0, x1, y1]``.
+Each field region should include the field's label so the shared field
+extractor can read it.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import redis
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.services.ocr_engine import get_ocr_engine
+from app.services.ocr_field_extractor import default_extractor
+from app.services.receipt_hash_index import dhash, hamming_distance
+
+logger = logging.getLogger(__name__)
+
+Box = tuple[float, float, float, float]
+
+
+@dataclass
+class ReceiptTemplate:
+    name: str
+    aspect_ratio: float  # height / width
+    fields: dict[str, Box]
+    header_region: Box = (0.0, 0.0, 1.0, 0.15)
+    header_keywords: tuple[str, ...] = ()
+    logo_hash: Optional[int] = None  # dHash of header_region
+    aspect_tolerance: float = 0.05  # relative to aspect_ratio
+    max_logo_distance: int = 10
+
+
+@dataclass
+class TemplateMatch:
+    template: ReceiptTemplate
+    values: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return all(name in self.values for name in self.template.fields)
+
+
+def crop(image: np.ndarray, box: Box) -> np.ndarray:
+    height, width = image.shape[:2]
+    x0, y0, x1, y1 = box
+    return image[
+        int(y0 * height) : int(y1 * height), int(x0 * width) : int(x1 * width)
+    ]
+
+
+def _ocr_lines(image: np.ndarray) -> list[str]:
+    text = get_ocr_engine().image_to_string(image)
+    return [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+
+
+class TemplateRegistry:
+    """Registered templates plus Redis-backed hit and success counters."""
+
+    STATS_KEY = "ocr_templates:stats"
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+        self._templates: list[ReceiptTemplate] = []
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def register(self, template: ReceiptTemplate) -> None:
+        self._templates.append(template)
+
+    def load_file(self, path: str) -> None:
+        for entry in json.loads(Path(path).read_text()):
+            logo_hash = entry.pop("logo_hash", None)
+            self.register(
+                ReceiptTemplate(
+                    **{
+                        **entry,
+                        "fields": {k: tuple(v) for k, v in entry["fields"].items()},
+                        "header_region": tuple(
+                            entry.get("header_region", (0.0, 0.0, 1.0, 0.15))
+                        ),
+                        "header_keywords": tuple(entry.get("header_keywords", ())),
+                        "logo_hash": int(logo_hash, 16) if logo_hash else None,
+                    }
+                )
+            )
+
+    def match(self, gray: np.ndarray) -> Optional[ReceiptTemplate]:
+        """Fingerprint the layout and return the first matching template."""
+        height, width = gray.shape[:2]
+        ratio = height / width
+        header_text: dict[Box, str] = {}
+
+        for template in self._templates:
+            if abs(ratio - template.aspect_ratio) > (
+                template.aspect_tolerance * template.aspect_ratio
+            ):
+                continue
+
+            header = crop(gray, template.header_region)
+            if template.logo_hash is not None:
+                distance = hamming_distance(dhash(header), template.logo_hash)
+                if distance <= template.max_logo_distance:
+                    return template
+            elif template.header_keywords:
+                # Templates sharing a header region share one OCR call
+                if template.header_region not in header_text:
+                    header_text[template.header_region] = " ".join(
+                        _ocr_lines(header)
+                    ).lower()
+                text = header_text[template.header_region]
+                if all(k.lower() in text for k in template.header_keywords):
+                    return template
+        return None
+
+    def extract(self, gray: np.ndarray) -> Optional[TemplateMatch]:
+        """OCR only the field regions of a matching template."""
+        template = self.match(gray)
+        if template is None:
+            self._record(None, False)
+            return None
+
+        result = TemplateMatch(template)
+        for name, box in template.fields.items():
+            value = default_extractor.extract(_ocr_lines(crop(gray, box))).values
+            if value.get(name):
+                result.values[name] = value[name]
+
+        self._record(template.name, result.complete)
+        return result
+
+    def _record(self, name: Optional[str], success: bool) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hincrby(self.STATS_KEY, "lookups", 1)
+            if name is None:
+                pipe.hincrby(self.STATS_KEY, "unmatched", 1)
+            else:
+                pipe.hincrby(self.STATS_KEY, f"{name}:hits", 1)
+                if success:
+                    pipe.hincrby(self.STATS_KEY, f"{name}:successes", 1)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Failed to record template stats: {e}")
+
+    def stats(self) -> dict:
+        """Per-template hit rate and extraction success rate."""
+        counters = {k: int(v) for k, v in self.client.hgetall(self.STATS_KEY).items()}
+        lookups = counters.get("lookups", 0)
+        templates = {}
+        for template in self._templates:
+            hits = counters.get(f"{template.name}:hits", 0)
+            successes = counters.get(f"{template.name}:successes", 0)
+            templates[template.name] = {
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "successes": successes,
+                "success_rate": successes / hits if hits else 0.0,
+            }
+        return {
+            "lookups": lookups,
+            "unmatched": counters.get("unmatched", 0),
+            "templates": templates,
+        }
+
+
+template_registry = TemplateRegistry()
+if settings.OCR_TEMPLATE_FILE:
+    template_registry.load_file(settings.OCR_TEMPLATE_FILE)
@@ -0,0 +1,166 @@
+"""
+Refresh tokens in Redis.
+
+Each token is a key ``refresh_token:<token>`` holding the user id, as
+before. Every user also has a sorted set of their live tokens scored by
+expiry time, so all of a user's sessions can be revoked in one call
+without scanning the keyspace. Issue, rotation and revocation are Lua
+scripts that update the token key and the index together in a single
+round trip; rotation consumes the old token and stores its replacement
+atomically, so two concurrent refreshes with the same cookie cannot both
+succeed.
+
+A token missing from its user's index, such as one issued before the
+index existed, is refused and deleted, so ``revoke_all`` never misses a
+live session; those users sign in again once.
+
+The scripts derive the index key from the stored user id, which a Redis
+Cluster deployment would not allow; this app runs against one instance.
+"""
+
+import time
+import uuid
+from typing import Optional
+
+import redis.asyncio
+
+from app.core.config import settings
+from app.core.redis_client import async_redis_client
+
+TOKEN_PREFIX = "refresh_token"
+INDEX_PREFIX = "refresh_tokens:user"
+
+# KEYS: token key, user index; ARGV: user id, token, ttl seconds, now
+_ISSUE_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[4])
+redis.call('ZADD', KEYS[2], tonumber(ARGV[4]) + tonumber(ARGV[3]), ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+# KEYS: token key; ARGV: token, index prefix. Returns the user id, or nil
+# when the token is unknown or missing from its user's index
+_LOOKUP_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return false
+end
+if not redis.call('ZSCORE', ARGV[2] .. ':' .. user_id, ARGV[1]) then
+    redis.call('DEL', KEYS[1])
+    return false
+end
+return user_id
+"""
+
+# KEYS: old token key, new token key; ARGV: old token, new token,
+# ttl seconds, now, index prefix. Returns the user id, or nil when the
+# old token is unknown, already used or missing from the index
+_ROTATE_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return false
+end
+local index = ARGV[5] .. ':' .. user_id
+if not redis.call('ZSCORE', index, ARGV[1]) then
+    redis.call('DEL', KEYS[1])
+    return false
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', index, ARGV[1])
+redis.call('SET', KEYS[2], user_id, 'EX', ARGV[3])
+redis.call('ZREMRANGEBYSCORE', index, '-inf', ARGV[4])
+redis.call('ZADD', index, tonumber(ARGV[4]) + tonumber(ARGV[3]), ARGV[2])
+redis.call('EXPIRE', index, ARGV[3])
+return user_id
+"""
+
+# KEYS: token key; ARGV: token, index prefix
+_REVOKE_SCRIPT = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', ARGV[2] .. ':' .. user_id, ARGV[1])
+return 1
+"""
+
+# KEYS: user index; ARGV: token prefix. Returns how many tokens were live
+_REVOKE_ALL_SCRIPT = """
+local tokens = redis.call('ZRANGE', KEYS[1], 0, -1)
+local revoked = 0
+for _, token in ipairs(tokens) do
+    revoked = revoked + redis.call('DEL', ARGV[1] .. ':' .. token)
+end
+redis.call('DEL', KEYS[1])
+return revoked
+"""
+
+
+class RefreshTokenStore:
+    def __init__(
+        self,
+        client: redis.asyncio.Redis = async_redis_client,
+        ttl_seconds: int = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._issue = client.register_script(_ISSUE_SCRIPT)
+        self._lookup = client.register_script(_LOOKUP_SCRIPT)
+        self._rotate = client.register_script(_ROTATE_SCRIPT)
+        self._revoke = client.register_script(_REVOKE_SCRIPT)
+        self._revoke_all = client.register_script(_REVOKE_ALL_SCRIPT)
+
+    def _key(self, token: str) -> str:
+        return f"{TOKEN_PREFIX}:{token}"
+
+    def _index_key(self, user_id: uuid.UUID) -> str:
+        return f"{INDEX_PREFIX}:{user_id}"
+
+    async def issue(self, user_id: uuid.UUID) -> str:
+        """Create a refresh token for a user who just signed in."""
+        token = str(uuid.uuid4())
+        await self._issue(
+            keys=[self._key(token), self._index_key(user_id)],
+            args=[str(user_id), token, self.ttl_seconds, int(time.time())],
+        )
+        return token
+
+    async def lookup(self, token: str) -> Optional[uuid.UUID]:
+        """
+        The user a refresh token belongs to, without consuming it, or None
+        if ``token`` is unknown, expired or was never indexed.
+        """
+        user_id = await self._lookup(
+            keys=[self._key(token)], args=[token, INDEX_PREFIX]
+        )
+        return uuid.UUID(user_id) if user_id is not None else None
+
+    async def rotate(self, token: str) -> Optional[tuple[uuid.UUID, str]]:
+        """
+        Exchange a refresh token for a new one. Returns the user id and
+        the new token, or None if ``token`` is unknown, expired or was
+        already rotated.
+        """
+        new_token = str(uuid.uuid4())
+        user_id = await self._rotate(
+            keys=[self._key(token), self._key(new_token)],
+            args=[token, new_token, self.ttl_seconds, int(time.time()), INDEX_PREFIX],
+        )
+        if user_id is None:
+            return None
+        return uuid.UUID(user_id), new_token
+
+    async def revoke(self, token: str) -> None:
+        """Sign out the session holding ``token``."""
+        await self._revoke(keys=[self._key(token)], args=[token, INDEX_PREFIX])
+
+    async def revoke_all(self, user_id: uuid.UUID) -> int:
+        """Sign a user out everywhere; returns how many sessions ended."""
+        return await self._revoke_all(
+            keys=[self._index_key(user_id)], args=[TOKEN_PREFIX]
+        )
+
+
+refresh_tokens = RefreshTokenStore()
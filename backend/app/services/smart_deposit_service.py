@@ -4,17 +4,23 @@ Smart-deposit service.
 Handles the two-step workflow:
   preview()  →  compute breakdown (no DB writes)
   execute()  →  create deposit + fine + loan-payment rows in one transaction
+
+Routes use the async methods; Celery tasks preview through
+preview_for_ocr_result(), which loads the same rows on a sync Session.
 """
 
 from __future__ import annotations
 
+import logging
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.policy.deposit_policy import DepositPolicy
 from app.models.deposit_model import Deposit, DepositType, DepositVerificationStatus
@@ -39,20 +45,56 @@ from app.schemas.smart_deposit_schema import (
     SmartDepositResponse,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _active_loans_statement(user_id: uuid.UUID):
+    return select(Loan).where(
+        Loan.user_id == user_id,
+        Loan.status.in_([LoanStatus.ACTIVE, LoanStatus.APPROVED]),
+    )
+
+
+def _ocr_preview_request(
+    ocr_data: dict, policy_id: uuid.UUID
+) -> DepositPreviewRequest:
+    """Preview request from parsed receipt fields, as OCR returns them."""
+    if not ocr_data.get("amount"):
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "No amount was found on the receipt",
+        )
+    return DepositPreviewRequest(
+        policy_id=policy_id,
+        ocr_amount=Decimal(str(ocr_data["amount"])),
+        ocr_charge=Decimal(str(ocr_data.get("charge") or 0)),
+        ocr_reference=ocr_data.get("reference"),
+        **({"ocr_date": ocr_data["date"]} if ocr_data.get("date") else {}),
+    )
+
 
 class SmartDepositService:
     """Handles preview + execute for the smart-deposit flow."""
 
-    def preview(
+    async def preview(
         self,
-        session: Session,
+        session: AsyncSession,
         req: DepositPreviewRequest,
         user_id: uuid.UUID,
     ) -> DepositPreviewResponse:
-        policy = session.get(DepositPolicy, req.policy_id)
+        policy = await session.get(DepositPolicy, req.policy_id)
         if not policy:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Deposit policy not found")
+        loans = list((await session.exec(_active_loans_statement(user_id))).all())
+        return self.build_preview(req, policy, loans)
 
+    @staticmethod
+    def build_preview(
+        req: DepositPreviewRequest,
+        policy: DepositPolicy,
+        loans: List[Loan],
+    ) -> DepositPreviewResponse:
+        """The breakdown for ``req`` given the policy and the user's active loans."""
         net_amount = req.ocr_amount  # - req.ocr_charge
         required_deposit = policy.amount_rupees  # Decimal in rupees
         now = req.ocr_date or datetime.now(timezone.utc)
@@ -124,11 +166,6 @@ class SmartDepositService:
                         editable=True,
                     )
                 )
-        stmt = select(Loan).where(
-            Loan.user_id == user_id,
-            Loan.status.in_([LoanStatus.ACTIVE, LoanStatus.APPROVED]),
-        )
-        loans = list(session.exec(stmt).all())
 
         loan_summaries = []
         for ln in loans:
@@ -162,13 +199,13 @@ class SmartDepositService:
             active_loans=loan_summaries,
         )
 
-    def execute(
+    async def execute(
         self,
-        session: Session,
+        session: AsyncSession,
         req: SmartDepositCreate,
         user_id: uuid.UUID,
     ) -> SmartDepositResponse:
-        policy = session.get(DepositPolicy, req.policy_id)
+        policy = await session.get(DepositPolicy, req.policy_id)
         if not policy:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Deposit policy not found")
 
@@ -246,7 +283,7 @@ class SmartDepositService:
             if la.amount_rupees <= 0:
                 continue
 
-            loan = session.get(Loan, la.loan_id)
+            loan = await session.get(Loan, la.loan_id)
             if not loan:
                 raise HTTPException(
                     status.HTTP_404_NOT_FOUND, f"Loan {la.loan_id} not found"
@@ -306,8 +343,8 @@ class SmartDepositService:
                 session.add(loan)
 
         # Commit everything
-        session.commit()
-        session.refresh(deposit)
+        await session.commit()
+        await session.refresh(deposit)
 
         total_allocated = sum(a.amount_rupees for a in req.allocations)
 
@@ -321,3 +358,33 @@ class SmartDepositService:
             total_allocated_rupees=total_allocated,
             message="Deposit created successfully",
         )
+
+
+def preview_for_ocr_result(
+    ocr_data: dict, policy_id: uuid.UUID, user_id: uuid.UUID
+) -> dict:
+    """
+    Deposit preview for a finished OCR result, outside a request; runs on
+    the sync engine so Celery workers need no event loop.
+    Returns ``{"preview": ...}`` with the JSON breakdown, or
+    ``{"preview_error": ...}`` so the caller can fall back to
+    POST /deposits/preview.
+    """
+    from app.core.db import engine
+
+    try:
+        req = _ocr_preview_request(ocr_data, policy_id)
+        with Session(engine) as session:
+            policy = session.get(DepositPolicy, policy_id)
+            if not policy:
+                raise HTTPException(
+                    status.HTTP_404_NOT_FOUND, "Deposit policy not found"
+                )
+            loans = list(session.exec(_active_loans_statement(user_id)).all())
+        preview = SmartDepositService.build_preview(req, policy, loans)
+    except HTTPException as e:
+        return {"preview_error": e.detail}
+    except (ValueError, SQLAlchemyError) as e:
+        logger.warning(f"Deposit preview for OCR result failed: {e}")
+        return {"preview_error": "Deposit preview is unavailable"}
+    return {"preview": preview.model_dump(mode="json")}
@@ -0,0 +1,116 @@
+"""
+OCR of multi-page PDF bank statements.
+
+A statement is split into one Celery subtask per page. Each subtask renders
+only its own page with ``pdf2image`` (poppler), so memory stays bounded by
+the worker concurrency rather than by the page count. Every row of the page
+is run through the same field extraction as single receipts, and finished
+pages are pushed to subscribers on the statement's event channel as they
+complete, so results stream back page by page.
+"""
+
+import json
+import logging
+import re
+from typing import Optional
+
+import numpy as np
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+
+from app.core.config import settings
+from app.core.redis_client import async_redis_client, redis_client
+from app.services.ocr_engine import get_ocr_engine
+from app.services.ocr_events import publish_task_event
+from app.services.ocr_service import OCRService
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_KEY_PREFIX = "ocr_statement"
+# Statement rows rarely label the amount; take the last money-like token
+_ROW_AMOUNT = re.compile(r"([\d,]+\.\d{2})(?!.*[\d,]+\.\d{2})")
+
+
+def statement_key(statement_id: str) -> str:
+    return f"{STATEMENT_KEY_PREFIX}:{statement_id}"
+
+
+class StatementService:
+
+    @staticmethod
+    def page_count(data: bytes) -> int:
+        """
+        Number of pages in a PDF, read without rendering any of them.
+        ``data`` can be any bytes-like buffer, such as an mmap of the upload.
+        """
+        try:
+            return int(pdfinfo_from_bytes(data)["Pages"])
+        except Exception as e:
+            raise ValueError(f"Could not read PDF: {e}") from e
+
+    @staticmethod
+    def render_page(data: bytes, page: int) -> np.ndarray:
+        """Rasterize a single 1-based page of a PDF as a grayscale array."""
+        images = convert_from_bytes(
+            data,
+            dpi=settings.OCR_STATEMENT_DPI,
+            first_page=page,
+            last_page=page,
+            grayscale=True,
+        )
+        if not images:
+            raise ValueError(f"PDF has no page {page}")
+        return np.asarray(images[0])
+
+    @staticmethod
+    def extract_page_transactions(gray_img: np.ndarray) -> list[dict]:
+        """
+        OCR one statement page and extract a transaction from every row that
+        carries a date, using the single-receipt field extraction.
+        """
+        data = get_ocr_engine().image_to_data(gray_img)
+        transactions = []
+        for row_text in OCRService.group_words_into_rows(data):
+            row_text = OCRService._normalize_row_text(row_text)
+            fields = OCRService.extract_transaction_data(row_text)
+            if not fields["date"]:
+                continue
+            if fields["amount"] is None:
+                match = _ROW_AMOUNT.search(row_text)
+                if match:
+                    fields["amount"] = float(match.group(1).replace(",", ""))
+            transactions.append({**fields, "row": row_text})
+        return transactions
+
+    @staticmethod
+    def finish_page(statement_id: str, pages: int, payload: dict) -> bool:
+        """
+        Publish a finished (or failed) page and count it towards the
+        statement. Returns True for the last page, after publishing the
+        statement's completion event.
+        """
+        publish_task_event(statement_id, {"statement_id": statement_id, **payload})
+        done = redis_client.hincrby(statement_key(statement_id), "pages_done", 1)
+        if done < pages:
+            return False
+        publish_task_event(
+            statement_id,
+            {"statement_id": statement_id, "status": "completed", "pages": pages},
+        )
+        return True
+
+    # The manifest is only read and written by the API, on the event loop
+
+    @staticmethod
+    async def load_manifest(statement_id: str) -> Optional[dict]:
+        raw = await async_redis_client.hget(statement_key(statement_id), "manifest")
+        return json.loads(raw) if raw is not None else None
+
+    @staticmethod
+    async def save_manifest(
+        statement_id: str, manifest: dict, ttl_seconds: int
+    ) -> None:
+        key = statement_key(statement_id)
+        pipe = async_redis_client.pipeline()
+        pipe.hset(key, mapping={"manifest": json.dumps(manifest), "pages_done": 0})
+        pipe.expire(key, ttl_seconds)
+        await pipe.execute()
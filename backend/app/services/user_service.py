@@ -1,90 +1,107 @@
 import uuid
 from typing import List, Optional
 from fastapi import HTTPException, status
-from sqlmodel import Session, select, func
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
 from app.models.user_model import User
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.refresh_tokens import refresh_tokens
 from app.schemas.user_schema import UserCreate, UserUpdate, AdminAssignUserRoles
 
 
 class UserService:
     """
-    Service class for user-related operations.
+    Service class for user-related operations, on an AsyncSession.
     """
 
-    def create_user(self, session: Session, user_in: UserCreate) -> User:
+    async def create_user(
+        self, session: AsyncSession, user_in: UserCreate
+    ) -> User:
         # Create user with explicit field mapping
         user_dict = user_in.model_dump(exclude={"password"})
-        user_dict["hashed_password"] = get_password_hash(user_in.password)
+        user_dict["hashed_password"] = await password_hasher.hash(user_in.password)
 
         user = User(**user_dict)
 
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await session.commit()
+        await session.refresh(user)
 
         return user
 
-    def update_user(self, session: Session, db_user: User, user_in: UserUpdate) -> User:
+    async def update_user(
+        self, session: AsyncSession, db_user: User, user_in: UserUpdate
+    ) -> User:
         user_data = user_in.model_dump(exclude_unset=True)
         db_user.sqlmodel_update(user_data)
         session.add(db_user)
-        session.commit()
-        session.refresh(db_user)
+        await principal_cache.invalidate(db_user.id)
+        await session.commit()
+        await session.refresh(db_user)
         return db_user
 
-    def change_user_password(
-        self, session: Session, user: User, new_password: str
+    async def change_user_password(
+        self, session: AsyncSession, user: User, new_password: str
     ) -> User:
         """
         Change the password for a user.
         """
-        user.hashed_password = get_password_hash(new_password)
+        user.hashed_password = await password_hasher.hash(new_password)
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await principal_cache.invalidate(user.id)
+        await session.commit()
+        await session.refresh(user)
+        # Sessions signed in with the old password end with it
+        await refresh_tokens.revoke_all(user.id)
         return user
 
-    def get_user_by_email(self, session: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(
+        self, session: AsyncSession, email: str
+    ) -> Optional[User]:
         statement = select(User).where(User.email == email, User.disabled == False)
-        return session.exec(statement).first()
+        return (await session.exec(statement)).first()
 
-    def get_user_by_id(self, session: Session, user_id: uuid.UUID) -> Optional[User]:
+    async def get_user_by_id(
+        self, session: AsyncSession, user_id: uuid.UUID
+    ) -> Optional[User]:
         statement = select(User).where(User.id == user_id)
-        return session.exec(statement).first()
+        return (await session.exec(statement)).first()
 
-    def authenticate_user(
-        self, session: Session, email: str, password: str
+    async def authenticate_user(
+        self, session: AsyncSession, email: str, password: str
     ) -> Optional[User]:
-        user = self.get_user_by_email(session, email)
-        if not user or not verify_password(password, user.hashed_password):
+        user = await self.get_user_by_email(session, email)
+        if not user or not await password_hasher.verify(
+            password, user.hashed_password
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
             )
         return user
 
-    def get_total_user_count(self, session: Session) -> int:
+    async def get_total_user_count(self, session: AsyncSession) -> int:
         """Get total user count (admin only)."""
         statement = select(func.count()).select_from(User)
-        total = session.exec(statement).one()
+        total = (await session.exec(statement)).one()
         return total
 
     # this method is for admin use to get all users
-    def get_all_users(
-        self, session: Session, skip: int = 0, limit: int = 10
+    async def get_all_users(
+        self, session: AsyncSession, skip: int = 0, limit: int = 10
     ) -> List[User]:
         """Get all user (admin only)."""
         statement = select(User).offset(skip).limit(limit)
-        users = list(session.exec(statement).all())
+        users = list((await session.exec(statement)).all())
         return users
 
-    def admin_assign_user_roles(
-        self, session: Session, user_id: uuid.UUID, user_in: AdminAssignUserRoles
+    async def admin_assign_user_roles(
+        self, session: AsyncSession, user_id: uuid.UUID, user_in: AdminAssignUserRoles
     ) -> User:
         """Admin assign user roles and disable user"""
-        user = self.get_user_by_id(session, user_id)
+        user = await self.get_user_by_id(session, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,15 +124,20 @@ class UserService:
         user.updated_at = datetime.now(timezone.utc)
 
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await principal_cache.invalidate(user.id)
+        await session.commit()
+        await session.refresh(user)
         return user
 
-    def admin_delete_user(self, session: Session, user_id: uuid.UUID) -> bool:
+    async def admin_delete_user(
+        self, session: AsyncSession, user_id: uuid.UUID
+    ) -> bool:
         """Admin delete of user."""
-        user = self.get_user_by_id(session, user_id)
+        user = await self.get_user_by_id(session, user_id)
         if not user:
             return False
-        session.delete(user)
-        session.commit()
+        await session.delete(user)
+        await principal_cache.invalidate(user_id)
+        await session.commit()
+        await refresh_tokens.revoke_all(user_id)
         return True
@@ -1 +1 @@
-from .ocr_task import process_ocr_task
+from .ocr_task import process_ocr_task, process_statement_page_task, prune_ocr_blobs
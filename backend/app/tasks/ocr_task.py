@@ -1,12 +1,32 @@
 from ..celery_app import celery_app
+from app.core.config import settings
+from app.services import ocr_events  # noqa: F401  (publishes task state changes)
+from app.services import ocr_admission  # noqa: F401  (releases finished tasks)
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from celery.utils.log import get_task_logger
-import os
-from pathlib import Path
+from kombu import Queue
 import logging
+import time
+from uuid import UUID
+
+from app.services.ocr_metrics import collect_stage_timings, ocr_metrics, stage
+from app.utils.cpu_topology import apply_thread_limits, plan_ocr_workers
 
 logger = get_task_logger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Failures that would repeat on every attempt: undecodable or unusable
+# images and parse errors (ValueError), images that have already expired
+# from the transport, and receipts that ran into the time limit
+NON_RETRYABLE_ERRORS = (ValueError, FileNotFoundError, SoftTimeLimitExceeded)
+
+# Size the pool from the CPUs this container may use, not the host's
+worker_plan = plan_ocr_workers(
+    processes=settings.OCR_WORKER_PROCESSES,
+    threads_per_process=settings.OCR_THREADS_PER_PROCESS,
+)
+
 
 celery_app.conf.update(
     task_serializer="json",
@@ -18,11 +38,92 @@ celery_app.conf.update(
     task_time_limit=300,  # 5 minutes hard limit
     task_soft_time_limit=240,  # 4 minutes soft limit
     worker_prefetch_multiplier=1,
+    # Workers consume OCR_PRIORITY_QUEUE first; the Redis transport otherwise
+    # rotates between queues. A worker started without -Q consumes these
+    task_default_queue="celery",
+    task_queues=(Queue(settings.OCR_PRIORITY_QUEUE), Queue("celery")),
+    broker_transport_options={"queue_order_strategy": "priority"},
+    worker_concurrency=worker_plan.processes,  # --concurrency still overrides
     worker_max_tasks_per_child=20,  # Restart worker after 10 tasks to prevent memory leaks
     result_expires=3600,  # Results expire in 1 hour
+    beat_schedule={
+        "prune-ocr-blobs": {"task": "prune_ocr_blobs", "schedule": 15 * 60},
+    },
 )
 
 
+@worker_init.connect
+def _log_worker_plan(**kwargs) -> None:
+    logger.info(
+        f"OCR worker sizing: {worker_plan.cpus} CPUs available, "
+        f"{worker_plan.processes} processes x "
+        f"{worker_plan.threads_per_process} threads"
+    )
+
+
+@worker_init.connect
+def _check_ocr_engine(**kwargs) -> None:
+    """Stop the worker before it forks if the configured engine is missing."""
+    from app.services.ocr_engine import require_ocr_engine
+
+    try:
+        require_ocr_engine()
+    except RuntimeError as e:
+        # Celery logs and swallows exceptions from signal handlers
+        logger.critical(str(e))
+        raise SystemExit(1) from e
+
+
+@worker_process_init.connect
+def _init_ocr_engine(**kwargs) -> None:
+    """
+    Cap library thread pools and load the OCR engine once per worker
+    process, before any task runs.
+    """
+    from app.services.ocr_engine import init_ocr_engine
+
+    apply_thread_limits(worker_plan.threads_per_process)
+    init_ocr_engine()
+
+
+@worker_process_shutdown.connect
+def _shutdown_ocr_engine(**kwargs) -> None:
+    from app.services.ocr_engine import shutdown_ocr_engine
+
+    shutdown_ocr_engine()
+
+
+def _run_ocr_pipeline(image, image_hash: str | None) -> dict:
+    """
+    OCR a decoded receipt image and flag it when an earlier receipt looks
+    the same and was read as the same transaction.
+    """
+    from app.services.ocr_service import OCRService
+    from app.services.receipt_hash_index import (
+        dhash,
+        flag_duplicate,
+        receipt_hash_index,
+    )
+
+    ocr_result = OCRService.perform_ocr(image)
+    if not settings.OCR_DUPLICATE_DETECTION_ENABLED:
+        return ocr_result
+
+    with stage("duplicate_lookup"):
+        phash = dhash(image)
+        duplicate = receipt_hash_index.find(phash, ocr_result)
+    with stage("duplicate_index"):
+        receipt_hash_index.add(phash, image_hash, ocr_result)
+    if duplicate is None:
+        return ocr_result
+
+    logger.info(
+        f"Receipt {phash:016x} matches {duplicate.phash:016x} "
+        f"(distance {duplicate.distance}) with the same transaction fields"
+    )
+    return flag_duplicate(ocr_result, duplicate.image_hash)
+
+
 # Load OCRService here to avoid circular imports
 @celery_app.task(
     bind=True,
@@ -30,36 +131,145 @@ celery_app.conf.update(
     max_retries=3,
     default_retry_delay=5,  # seconds
 )
-def process_ocr_task(self, image_path: str) -> dict:
+def process_ocr_task(
+    self,
+    image_ref: str,
+    image_hash: str | None = None,
+    deposit_preview: dict | None = None,
+) -> dict:
     """
     Celery task to perform OCR on an image and extract transaction data.
-    Retries up to 3 times in case of failure.
+    ``image_ref`` is an image transport handle (e.g. ``redis:<id>``).
+    With ``deposit_preview`` (``policy_id`` and ``user_id``) the smart-deposit
+    preview is computed right after OCR and returned alongside the data.
+    Transient failures are retried up to 3 times with exponential backoff;
+    NON_RETRYABLE_ERRORS fail the task immediately.
+    When ``image_hash`` is given the parsed result is cached under it.
+    The result's ``metrics`` hold per-stage timings and the image size,
+    which are also added to the OCR latency histograms.
     """
+    from app.services.image_transport import discard_image, load_image_bytes
 
     try:
-        logger.info(
-            f"Starting OCR task for image: {self.request.id} at path: {image_path}"
-        )
+        logger.info(f"Starting OCR task for image: {self.request.id} ({image_ref})")
 
         # Perform OCR using OCRService
         from app.services.ocr_service import (
             OCRService,
         )  # Local import to avoid circular dependency
 
-        ocr_result = OCRService.perform_ocr_on_image(image_path)
-        logger.info(f"OCR task completed for image: {self.request.id}")
+        with collect_stage_timings() as timings:
+            start = time.perf_counter()
+            with stage("load_image"):
+                image_bytes = load_image_bytes(image_ref)
+            with stage("decode"):
+                image = OCRService.decode_image(image_bytes)
+            ocr_result = _run_ocr_pipeline(image, image_hash)
 
-        return {"status": "success", "data": ocr_result}
+            if image_hash and settings.OCR_CACHE_ENABLED:
+                from app.services.ocr_cache import ocr_result_cache
+
+                with stage("cache_store"):
+                    ocr_result_cache.set(image_hash, ocr_result)
+
+            result = {"status": "success", "data": ocr_result}
+            if deposit_preview is not None:
+                from app.services.smart_deposit_service import preview_for_ocr_result
+
+                with stage("deposit_preview"):
+                    result.update(
+                        preview_for_ocr_result(
+                            ocr_result,
+                            UUID(deposit_preview["policy_id"]),
+                            UUID(deposit_preview["user_id"]),
+                        )
+                    )
+            # Only once nothing left can fail: a retry needs the image
+            discard_image(image_ref)
+            timings["total"] = (time.perf_counter() - start) * 1000
+
+        height, width = image.shape[:2]
+        result["metrics"] = {
+            "timings_ms": {name: round(ms, 2) for name, ms in timings.items()},
+            "image_bytes": len(image_bytes),
+            "image_width": width,
+            "image_height": height,
+        }
+        ocr_metrics.record(
+            {
+                **timings,
+                "image_kb": len(image_bytes) / 1024,
+                "image_megapixels": width * height / 1e6,
+            }
+        )
+        logger.info(
+            f"OCR task completed for image: {self.request.id} "
+            f"in {timings['total']:.0f}ms"
+        )
+        return result
+    except NON_RETRYABLE_ERRORS as exc:
+        logger.error(
+            f"OCR task failed for image: {self.request.id} with error: {exc} "
+            "(not retrying)"
+        )
+        discard_image(image_ref)
+        raise
     except Exception as exc:
         logger.error(f"OCR task failed for image: {self.request.id} with error: {exc}")
-        raise self.retry(exc=exc)
-    finally:
-        # Clean up temporary file
-        if Path(image_path).exists():
-            try:
-                os.remove(image_path)
-                logger.info(f"Temporary file {image_path} removed.")
-            except Exception as cleanup_exc:
-                logger.warning(
-                    f"Failed to remove temporary file {image_path}: {cleanup_exc}"
-                )
+        # Keep the image around while retries remain
+        if self.request.retries >= self.max_retries:
+            discard_image(image_ref)
+        raise self.retry(
+            exc=exc, countdown=self.default_retry_delay * 2**self.request.retries
+        )
+
+
+@celery_app.task(
+    bind=True,
+    name="ocr_statement_page_task",
+    max_retries=3,
+    default_retry_delay=5,  # seconds
+)
+def process_statement_page_task(
+    self, statement_id: str, pdf_ref: str, page: int, pages: int
+) -> dict:
+    """
+    OCR one page of a PDF statement and publish its transactions on the
+    statement's event channel. The page that finishes the statement
+    discards the uploaded PDF.
+    """
+    from app.services.image_transport import discard_image, load_image_bytes
+    from app.services.statement_service import StatementService
+
+    def finish(payload: dict) -> None:
+        if StatementService.finish_page(statement_id, pages, payload):
+            discard_image(pdf_ref)
+
+    try:
+        image = StatementService.render_page(load_image_bytes(pdf_ref), page)
+        transactions = StatementService.extract_page_transactions(image)
+    except Exception as exc:
+        logger.error(f"OCR of statement {statement_id} page {page} failed: {exc}")
+        retryable = not isinstance(exc, NON_RETRYABLE_ERRORS)
+        if retryable and self.request.retries < self.max_retries:
+            raise self.retry(
+                exc=exc, countdown=self.default_retry_delay * 2**self.request.retries
+            )
+        finish({"status": "page_failed", "page": page, "message": str(exc)})
+        raise
+
+    result = {"page": page, "transactions": transactions}
+    finish({"status": "page", **result})
+    return result
+
+
+@celery_app.task(name="prune_ocr_blobs")
+def prune_ocr_blobs() -> int:
+    """Remove expired images from the local blob store transport."""
+    from app.services.image_transport import get_image_transport
+
+    if settings.OCR_IMAGE_TRANSPORT != "blob":
+        return 0
+    removed = get_image_transport("blob").prune()
+    logger.info(f"Pruned {removed} expired OCR blobs")
+    return removed
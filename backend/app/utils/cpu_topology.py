@@ -0,0 +1,85 @@
+"""
+CPU budget detection and OCR worker sizing.
+
+Tesseract (OpenMP) and OpenCV each start their own thread pool sized to the
+whole machine, so N worker processes on an N-core node run N² threads. The
+OCR worker instead derives its process count from the CPUs it may actually
+use (affinity mask and cgroup quota) and caps every library at a fixed
+number of threads per process.
+"""
+
+import logging
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota from cgroup v2 or v1, or None when unlimited."""
+    cpu_max = Path("/sys/fs/cgroup/cpu.max")
+    if cpu_max.exists():
+        quota, _, period = cpu_max.read_text().strip().partition(" ")
+        if quota != "max":
+            return int(quota) / int(period or 100000)
+        return None
+
+    quota_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period_file = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota_file.exists() and period_file.exists():
+        quota = int(quota_file.read_text())
+        if quota > 0:
+            return quota / int(period_file.read_text())
+    return None
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and cgroup quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+
+    try:
+        limit = _cgroup_cpu_limit()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read cgroup CPU quota: {e}")
+        limit = None
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+@dataclass(frozen=True)
+class OCRWorkerPlan:
+    processes: int
+    threads_per_process: int
+    cpus: int
+
+
+def plan_ocr_workers(
+    processes: Optional[int] = None, threads_per_process: int = 1
+) -> OCRWorkerPlan:
+    """Fill the CPU budget with processes of ``threads_per_process`` threads."""
+    cpus = available_cpus()
+    threads_per_process = max(1, threads_per_process)
+    if not processes:
+        processes = max(1, cpus // threads_per_process)
+    return OCRWorkerPlan(processes, threads_per_process, cpus)
+
+
+def apply_thread_limits(threads: int) -> None:
+    """
+    Cap OpenMP (tesseract) and OpenCV threads for this process. Must run
+    before tesseract is loaded; the environment is also inherited by the
+    tesseract subprocesses pytesseract starts.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    import cv2
+
+    cv2.setNumThreads(threads)
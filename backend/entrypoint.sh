@@ -37,9 +37,14 @@ case "$ROLE" in
     
   worker)
     echo "Starting Celery worker..."
+    # Concurrency is derived from the container's CPU budget unless
+    # CELERY_CONCURRENCY is set explicitly. Without CELERY_QUEUES the worker
+    # consumes the queues in the Celery config: OCR_PRIORITY_QUEUE (treasurer
+    # batch jobs) before the default queue
     exec celery -A app.celery_app worker \
       --loglevel="${CELERY_LOG_LEVEL:-info}" \
-      --concurrency="${CELERY_CONCURRENCY:-4}" \
+      ${CELERY_QUEUES:+-Q "$CELERY_QUEUES"} \
+      ${CELERY_CONCURRENCY:+--concurrency="$CELERY_CONCURRENCY"} \
       --max-tasks-per-child="${CELERY_MAX_TASKS_PER_CHILD:-50}"
     ;;
     
@@ -0,0 +1,169 @@
+"""
+End-to-end OCR benchmark over receipt corpora with known field values.
+
+A corpus is a directory of images plus ``ground_truth.json`` mapping each
+filename to its ``amount``, ``charge``, ``date`` and ``reference`` (see
+synthetic_corpus.py; real anonymized samples use the same file). Every image
+goes through OCRService in this process, and the run reports images/sec,
+per-stage latency, peak memory and field-level accuracy.
+
+Usage: python ocr_test/accuracy_benchmark.py [CORPUS_DIR ...]
+           [--baseline-out FILE] [--compare FILE]
+Defaults to ocr_test/corpus/synthetic. ``--baseline-out`` writes the report
+as JSON; ``--compare`` prints the change against an earlier baseline.
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services.ocr_metrics import collect_stage_timings, stage  # type: ignore
+from app.services.ocr_service import OCRService  # type: ignore
+
+
+FIELDS = ("amount", "charge", "date", "reference")
+default_corpus = Path(__file__).resolve().parent / "corpus" / "synthetic"
+
+
+def _pop_option(args: list[str], name: str) -> str | None:
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i : i + 2]
+        return value
+    return None
+
+
+def _field_matches(expected, actual) -> bool:
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return abs(expected - actual) < 0.005
+    return expected == actual
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run(corpora: list[Path]) -> dict:
+    samples = []
+    for corpus in corpora:
+        truth = json.loads((corpus / "ground_truth.json").read_text())
+        samples.extend((corpus / name, fields) for name, fields in truth.items())
+
+    stage_ms: dict[str, list[float]] = {}
+    correct = dict.fromkeys(FIELDS, 0)
+    expected_counts = dict.fromkeys(FIELDS, 0)
+    all_correct = 0
+    failures = []
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for path, expected in samples:
+        with collect_stage_timings() as timings:
+            task_start = time.perf_counter()
+            try:
+                with stage("load_image"):
+                    image = OCRService.load_image(str(path))
+                result = OCRService.perform_ocr(image)
+            except Exception as e:
+                result = {}
+                failures.append({"image": path.name, "error": str(e)})
+            timings["total"] = (time.perf_counter() - task_start) * 1000
+        for name, ms in timings.items():
+            stage_ms.setdefault(name, []).append(ms)
+
+        ok = True
+        for name in FIELDS:
+            if expected.get(name) is None:
+                continue
+            expected_counts[name] += 1
+            if _field_matches(expected[name], result.get(name)):
+                correct[name] += 1
+            else:
+                ok = False
+        all_correct += ok
+    elapsed = time.perf_counter() - start
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "corpora": [str(c) for c in corpora],
+        "images": len(samples),
+        "images_per_sec": round(len(samples) / elapsed, 3),
+        # ru_maxrss is in KB on Linux and includes tesseract's native memory
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "peak_python_heap_mb": round(peak_python / 2**20, 1),
+        "stages_ms": {
+            name: {
+                "mean": round(statistics.mean(values), 2),
+                "p50": round(_percentile(values, 0.50), 2),
+                "p95": round(_percentile(values, 0.95), 2),
+                "p99": round(_percentile(values, 0.99), 2),
+            }
+            for name, values in stage_ms.items()
+        },
+        "accuracy": {
+            **{
+                name: round(correct[name] / expected_counts[name], 4)
+                for name in FIELDS
+                if expected_counts[name]
+            },
+            "all_fields": round(all_correct / len(samples), 4) if samples else 0.0,
+        },
+        "failures": failures,
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    print(f"\nCompared with baseline from {baseline['generated_at']}:")
+    rows = [
+        ("images/sec", report["images_per_sec"], baseline["images_per_sec"]),
+        ("peak RSS MB", report["peak_rss_mb"], baseline["peak_rss_mb"]),
+    ]
+    rows += [
+        (f"{name} p95 ms", values["p95"], baseline["stages_ms"][name]["p95"])
+        for name, values in report["stages_ms"].items()
+        if name in baseline["stages_ms"]
+    ]
+    rows += [
+        (f"{name} accuracy", value, baseline["accuracy"][name])
+        for name, value in report["accuracy"].items()
+        if name in baseline["accuracy"]
+    ]
+    for label, now, before in rows:
+        change = f"{(now - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"  {label:28s} {before:>10} -> {now:>10}  ({change})")
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    baseline_out = _pop_option(args, "--baseline-out")
+    compare_with = _pop_option(args, "--compare")
+    corpora = [Path(a) for a in args] or [default_corpus]
+
+    report = run(corpora)
+    print(json.dumps({k: v for k, v in report.items() if k != "failures"}, indent=2))
+    if report["failures"]:
+        print(f"{len(report['failures'])} images failed OCR")
+
+    if compare_with:
+        compare(report, json.loads(Path(compare_with).read_text()))
+    if baseline_out:
+        Path(baseline_out).write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {baseline_out}")
+
+
+if __name__ == "__main__":
+    main()
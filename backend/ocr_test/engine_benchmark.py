@@ -0,0 +1,59 @@
+"""
+Per-image OCR latency of each engine backend.
+
+Usage: python ocr_test/engine_benchmark.py [image ...] [--runs N]
+Defaults to every image in ocr_test/receipts.
+"""
+
+from pathlib import Path
+import cv2
+import statistics
+import sys
+import time
+
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services.ocr_engine import create_ocr_engine  # type: ignore
+from app.services.ocr_service import OCRService  # type: ignore
+
+
+receipts_dir = Path(__file__).resolve().parent / "receipts"
+
+args = sys.argv[1:]
+runs = 5
+if "--runs" in args:
+    i = args.index("--runs")
+    runs = int(args[i + 1])
+    del args[i : i + 2]
+
+paths = [Path(a) for a in args] or sorted(
+    p for p in receipts_dir.glob("*") if p.suffix.lower() in {".jpg", ".jpeg", ".png"}
+)
+images = [
+    cv2.cvtColor(OCRService.load_image(str(p)), cv2.COLOR_BGR2GRAY) for p in paths
+]
+print(f"{len(images)} images, {runs} runs each")
+
+for name in ("pytesseract", "tesserocr"):
+    try:
+        engine = create_ocr_engine(name)
+    except ImportError:
+        print(f"{name:12s} not installed")
+        continue
+
+    engine.image_to_data(images[0])  # warm-up
+    latencies = []
+    for _ in range(runs):
+        for image in images:
+            start = time.perf_counter()
+            engine.image_to_data(image)
+            latencies.append((time.perf_counter() - start) * 1000)
+    engine.close()
+
+    latencies.sort()
+    print(
+        f"{name:12s} mean={statistics.mean(latencies):7.1f}ms "
+        f"p50={latencies[len(latencies) // 2]:7.1f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95)]:7.1f}ms"
+    )
@@ -14,4 +14,9 @@ file_path = receipts_dir / "WhatsApp Image 2025-12-02 at 08.07.36.jpeg"
 
 data = OCRService.perform_ocr_on_image(str(file_path))
 
-print(data)
\ No newline at end of file
+print(data)
+
+# compare the original path against the preprocessing pipeline
+if "--compare" in sys.argv:
+    image = OCRService.load_image(str(file_path))
+    print(OCRService.compare_preprocessing(image))
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+OCR throughput (images/sec) across worker process and thread counts.
+
+Each combination runs a process pool the way a Celery worker would: every
+process caps its OpenMP/OpenCV threads and loads its OCR engine once, then
+OCRs the corpus. Use it to pick OCR_WORKER_PROCESSES and
+OCR_THREADS_PER_PROCESS for a node type.
+
+Usage: python ocr_test/throughput_benchmark.py [image ...]
+           [--processes 1,2,4] [--threads 1,2] [--runs N]
+Defaults to every image in ocr_test/receipts, a process sweep up to the
+available CPUs and 1 or 2 threads per process.
+"""
+
+from pathlib import Path
+import multiprocessing
+import sys
+import time
+
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.utils.cpu_topology import apply_thread_limits, available_cpus  # type: ignore
+
+
+receipts_dir = Path(__file__).resolve().parent / "receipts"
+
+
+def _pop_option(args: list[str], name: str, default: str) -> str:
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1]
+        del args[i : i + 2]
+        return value
+    return default
+
+
+def _init_worker(threads: int) -> None:
+    # Thread limits must be in place before tesseract is loaded
+    apply_thread_limits(threads)
+
+    from app.services.ocr_engine import init_ocr_engine  # type: ignore
+
+    init_ocr_engine()
+
+
+def _ocr(path: str) -> None:
+    from app.services.ocr_service import OCRService  # type: ignore
+
+    OCRService.perform_ocr(OCRService.load_image(path))
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    cpus = available_cpus()
+    default_processes = sorted({1, *range(2, cpus + 1, 2), cpus})
+    processes = [
+        int(p)
+        for p in _pop_option(
+            args, "--processes", ",".join(map(str, default_processes))
+        ).split(",")
+    ]
+    threads = [int(t) for t in _pop_option(args, "--threads", "1,2").split(",")]
+    runs = int(_pop_option(args, "--runs", "3"))
+
+    paths = [str(Path(a)) for a in args] or sorted(
+        str(p)
+        for p in receipts_dir.glob("*")
+        if p.suffix.lower() in {".jpg", ".jpeg", ".png"}
+    )
+    corpus = paths * runs
+    print(f"{cpus} CPUs available, {len(paths)} images x {runs} runs")
+
+    results = []
+    for p in processes:
+        for t in threads:
+            with multiprocessing.get_context("spawn").Pool(
+                p, initializer=_init_worker, initargs=(t,)
+            ) as pool:
+                pool.map(_ocr, paths[:p])  # warm-up: one image per process
+                start = time.perf_counter()
+                pool.map(_ocr, corpus, chunksize=1)
+                elapsed = time.perf_counter() - start
+
+            rate = len(corpus) / elapsed
+            results.append((rate, p, t))
+            print(
+                f"processes={p:3d} threads={t:2d} "
+                f"({p * t:3d} threads total)  {rate:7.2f} images/sec"
+            )
+
+    rate, p, t = max(results)
+    print(
+        f"\nBest: OCR_WORKER_PROCESSES={p} OCR_THREADS_PER_PROCESS={t} "
+        f"({rate:.2f} images/sec)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import asyncio
+import io
+from unittest import mock
+
+from fastapi import UploadFile
+
+from app.api.v1.endpoints import ocr
+from app.core.config import settings
+
+CACHED = {"amount": 500.0, "reference": "ABC123"}
+
+
+def _stage(data: bytes):
+    upload = mock.Mock()
+    transport = mock.Mock(open_upload=mock.Mock(return_value=upload))
+    file = UploadFile(io.BytesIO(data), filename="receipt.png")
+    with mock.patch.object(ocr, "get_image_transport", return_value=transport):
+        return asyncio.run(ocr._stage_upload(file)), upload
+
+
+def test_exact_reupload_is_flagged_as_duplicate(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_DUPLICATE_DETECTION_ENABLED", True)
+    monkeypatch.setattr(
+        ocr.ocr_result_cache, "get", mock.Mock(return_value=dict(CACHED))
+    )
+
+    (image_ref, image_hash, cached), upload = _stage(b"receipt bytes")
+
+    assert image_ref is None
+    upload.abort.assert_called_once()
+    assert cached == {
+        **CACHED,
+        "possible_duplicate": True,
+        "duplicate_of": image_hash,
+    }
+
+
+def test_cached_result_is_not_flagged_without_duplicate_detection(monkeypatch):
+    monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "OCR_DUPLICATE_DETECTION_ENABLED", False)
+    monkeypatch.setattr(
+        ocr.ocr_result_cache, "get", mock.Mock(return_value=dict(CACHED))
+    )
+
+    (_, _, cached), _ = _stage(b"receipt bytes")
+
+    assert cached == CACHED
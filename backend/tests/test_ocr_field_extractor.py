@@ -0,0 +1,42 @@
+from app.services.ocr_field_extractor import default_extractor
+
+
+def test_unparseable_date_does_not_hide_a_later_one():
+    result = default_extractor.extract(
+        [
+            "Paid on 12/Jan/2024 10:30",
+            "Transaction Date 13 Jan 2024, 10:30 AM",
+        ]
+    )
+    assert result.values["date"] == "13 Jan 2024, 10:30 AM"
+    assert result.rows["date"] == 1
+
+
+def test_unparseable_amount_is_skipped():
+    result = default_extractor.extract(["Amount ,", "Total Amount 1,250.00"])
+    assert result.values["amount"] == "1,250.00"
+    assert result.rows["amount"] == 1
+
+
+def test_reference_value_overlapping_an_amount_keeps_both():
+    result = default_extractor.extract(["Transaction ID: NPR500"])
+    assert result.values["reference"] == "NPR500"
+    assert result.values["amount"] == "500"
+    assert result.spans["amount"] == (19, 22)
+
+
+def test_reference_value_overlapping_a_date_keeps_both():
+    result = default_extractor.extract(["TXN ID 12 Jan 2024 10:30"])
+    assert result.values["reference"] == "12"
+    assert result.values["date"] == "12 Jan 2024 10:30"
+
+
+def test_first_row_wins_and_labelled_date_beats_bare_date_in_a_row():
+    result = default_extractor.extract(
+        [
+            "01 Feb 2024 09:00 Payment Time: 02 Feb 2024, 09:00 AM",
+            "Transaction Date 03 Feb 2024, 09:00 AM",
+        ]
+    )
+    assert result.values["date"] == "02 Feb 2024, 09:00 AM"
+    assert result.rows["date"] == 0
@@ -0,0 +1,39 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from app.services import ocr_service
+from app.services.image_quality import ImageQualityError
+from app.services.ocr_service import OCRService
+from app.tasks.ocr_task import NON_RETRYABLE_ERRORS
+
+IMAGE = np.full((40, 40, 3), 255, np.uint8)
+
+
+def _engine(error: Exception) -> mock.Mock:
+    return mock.Mock(image_to_data=mock.Mock(side_effect=error))
+
+
+@pytest.fixture(autouse=True)
+def _no_template(monkeypatch):
+    monkeypatch.setattr(OCRService, "_extract_with_template", lambda gray: None)
+
+
+def test_bad_input_errors_stay_non_retryable(monkeypatch):
+    error = ImageQualityError("Image could not be decoded.")
+    monkeypatch.setattr(ocr_service, "get_ocr_engine", lambda: _engine(error))
+
+    with pytest.raises(ImageQualityError) as raised:
+        OCRService.perform_ocr(IMAGE, preprocess=False)
+    assert isinstance(raised.value, NON_RETRYABLE_ERRORS)
+
+
+def test_unexpected_engine_errors_are_wrapped(monkeypatch):
+    error = OSError("tesseract crashed")
+    monkeypatch.setattr(ocr_service, "get_ocr_engine", lambda: _engine(error))
+
+    with pytest.raises(RuntimeError) as raised:
+        OCRService.perform_ocr(IMAGE, preprocess=False)
+    assert raised.value.__cause__ is error
+    assert not isinstance(raised.value, NON_RETRYABLE_ERRORS)
@@ -27,6 +27,7 @@ import { Separator } from "@/components/ui/separator"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table"
 import { apiClient } from "@/api/api"
+import { ENV } from "@/config/env"
 
 // ─── Types ───────────────────────────────────────────────────────────────────
 
@@ -51,6 +52,7 @@ interface OcrResult {
   charge: number | null
   date: string | null
   reference: string | null
+  possible_duplicate?: boolean
 }
 
 type SplitCategory = "deposit" | "fine" | "advance" | "loan_principal" | "loan_interest" | "loan_renewal"
@@ -169,6 +171,11 @@ export function DepositTab() {
   const [preview, setPreview] = useState<PreviewResponse | null>(null)
   const [previewError, setPreviewError] = useState<string | null>(null)
 
+  // Preview computed by the OCR worker (pipeline mode), keyed by result + policy
+  const pipelinedPreview = useRef<{ result: OcrResult; policyId: string; preview: PreviewResponse } | null>(
+    null
+  )
+
   // Editable allocations (user can adjust the split)
   const [allocations, setAllocations] = useState<SplitAllocation[]>([])
 
@@ -224,32 +231,78 @@ export function DepositTab() {
     try {
       const formData = new FormData()
       formData.append("file", file)
+      // Let the worker compute the deposit preview right after OCR
+      const policyId = selectedPolicyId
+      if (policyId) formData.append("policy_id", policyId)
+
+      type TaskResult = { data?: OcrResult; preview?: PreviewResponse }
+      const unpack = (taskResult: TaskResult | undefined) => {
+        const result = (taskResult?.data ?? taskResult) as OcrResult
+        pipelinedPreview.current =
+          policyId && taskResult?.preview ? { result, policyId, preview: taskResult.preview } : null
+        return result
+      }
 
       const uploadRes = await apiClient.post("/v1/ocr/process-image", formData, {
         headers: { "Content-Type": "multipart/form-data" },
       })
 
-      const taskId = uploadRes.data.task_id
+      // Previously processed images come back already completed (cache hit)
+      if (uploadRes.data.status === "completed") {
+        setOcrResult(unpack(uploadRes.data.result))
+        return
+      }
 
-      const poll = async (): Promise<OcrResult> => {
-        const statusRes = await apiClient.get(`/v1/ocr/task-status/${taskId}`)
-        const data = statusRes.data
+      const taskId = uploadRes.data.task_id
 
+      const toResult = (data: { status: string; result?: TaskResult; message?: string }) => {
         if (data.status === "completed") {
-          const taskResult = data.result
-          return (taskResult?.data ?? taskResult) as OcrResult
-        } else if (data.status === "failed") {
+          return unpack(data.result)
+        }
+        if (data.status === "failed") {
           throw new Error(data.message || "OCR processing failed")
-        } else {
-          await new Promise((r) => setTimeout(r, OCR_POLL_INTERVAL))
-          return poll()
         }
+        return null
+      }
+
+      // Pushed status updates; resolves null if the stream is unavailable
+      const listen = () =>
+        new Promise<OcrResult | null>((resolve, reject) => {
+          const source = new EventSource(`${ENV.API_BASE}/v1/ocr/task-events/${taskId}`, {
+            withCredentials: true,
+          })
+          source.addEventListener("status", (event) => {
+            try {
+              const result = toResult(JSON.parse((event as MessageEvent).data))
+              if (result) {
+                source.close()
+                resolve(result)
+              }
+            } catch (err) {
+              source.close()
+              reject(err)
+            }
+          })
+          source.onerror = () => {
+            source.close()
+            resolve(null)
+          }
+        })
+
+      const poll = async (): Promise<OcrResult> => {
+        const statusRes = await apiClient.get(`/v1/ocr/task-status/${taskId}`)
+        const result = toResult(statusRes.data)
+        if (result) return result
+        await new Promise((r) => setTimeout(r, OCR_POLL_INTERVAL))
+        return poll()
       }
 
-      const result = await poll()
+      const result = (await listen()) ?? (await poll())
       setOcrResult(result)
-    } catch (err: unknown) {
-      const msg = err instanceof Error ? err.message : "OCR processing failed"
+    } catch (err: any) {
+      // Rejected uploads (e.g. blurry or too small) carry the reason in `detail`
+      const msg =
+        err?.response?.data?.detail || (err instanceof Error ? err.message : "OCR processing failed")
       setOcrError(msg)
     } finally {
       setOcrLoading(false)
@@ -285,9 +338,46 @@ export function DepositTab() {
 
   // ─── Preview (after OCR completes + policy is selected) ─────────────────
 
+  const applyPreview = useCallback((data: PreviewResponse) => {
+    setPreview({
+      ...data,
+      ocr_amount: Number(data.ocr_amount),
+      ocr_charge: Number(data.ocr_charge),
+      net_amount: Number(data.net_amount),
+      required_deposit: Number(data.required_deposit),
+      fine_amount: Number(data.fine_amount),
+      fine_percentage: Number(data.fine_percentage),
+      excess_amount: Number(data.excess_amount),
+      active_loans: data.active_loans.map((ln: LoanSummary) => ({
+        ...ln,
+        principal_paisa: Number(ln.principal_paisa),
+        accrued_interest_paisa: Number(ln.accrued_interest_paisa),
+        total_paid_paisa: Number(ln.total_paid_paisa),
+        outstanding_principal_paisa: Number(ln.outstanding_principal_paisa),
+        outstanding_interest_paisa: Number(ln.outstanding_interest_paisa),
+        interest_rate: Number(ln.interest_rate),
+      })),
+    })
+    // Ensure allocation amounts are numbers (backend sends Decimal as string)
+    setAllocations(
+      data.allocations.map((a: SplitAllocation) => ({
+        ...a,
+        amount_rupees: Number(a.amount_rupees),
+      }))
+    )
+  }, [])
+
   const fetchPreview = useCallback(async () => {
     if (!ocrResult || !selectedPolicyId || ocrResult.amount == null) return
 
+    // Already computed by the worker for this receipt and policy
+    const pipelined = pipelinedPreview.current
+    if (pipelined && pipelined.result === ocrResult && pipelined.policyId === selectedPolicyId) {
+      setPreviewError(null)
+      applyPreview(pipelined.preview)
+      return
+    }
+
     setPreviewLoading(true)
     setPreviewError(null)
 
@@ -299,40 +389,14 @@ export function DepositTab() {
         ocr_date: ocrResult.date ?? new Date().toISOString(),
         ocr_reference: ocrResult.reference,
       })
-      const data = res.data as PreviewResponse
-      setPreview({
-        ...data,
-        ocr_amount: Number(data.ocr_amount),
-        ocr_charge: Number(data.ocr_charge),
-        net_amount: Number(data.net_amount),
-        required_deposit: Number(data.required_deposit),
-        fine_amount: Number(data.fine_amount),
-        fine_percentage: Number(data.fine_percentage),
-        excess_amount: Number(data.excess_amount),
-        active_loans: data.active_loans.map((ln: LoanSummary) => ({
-          ...ln,
-          principal_paisa: Number(ln.principal_paisa),
-          accrued_interest_paisa: Number(ln.accrued_interest_paisa),
-          total_paid_paisa: Number(ln.total_paid_paisa),
-          outstanding_principal_paisa: Number(ln.outstanding_principal_paisa),
-          outstanding_interest_paisa: Number(ln.outstanding_interest_paisa),
-          interest_rate: Number(ln.interest_rate),
-        })),
-      })
-      // Ensure allocation amounts are numbers (backend sends Decimal as string)
-      setAllocations(
-        data.allocations.map((a: SplitAllocation) => ({
-          ...a,
-          amount_rupees: Number(a.amount_rupees),
-        }))
-      )
+      applyPreview(res.data as PreviewResponse)
     } catch (err: unknown) {
       const msg = err instanceof Error ? err.message : "Failed to compute deposit preview"
       setPreviewError(msg)
     } finally {
       setPreviewLoading(false)
     }
-  }, [ocrResult, selectedPolicyId])
+  }, [ocrResult, selectedPolicyId, applyPreview])
 
   // Auto-fetch preview when OCR completes and policy is selected
   useEffect(() => {
@@ -657,6 +721,12 @@ export function DepositTab() {
                     </div>
                   </div>
                 )}
+                {ocrResult.possible_duplicate && (
+                  <p className="mt-3 flex items-center gap-1 text-xs text-orange-700 dark:text-orange-400">
+                    <AlertCircle className="h-3.5 w-3.5" />
+                    This voucher looks like one that was already submitted
+                  </p>
+                )}
                 <p className="mt-2 flex items-center gap-1 text-[11px] text-muted-foreground">
                   <Info className="h-3 w-3" />
                   Extracted from the voucher image — cannot be edited